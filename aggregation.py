@@ -0,0 +1,256 @@
+import os
+import json
+import hashlib
+import shutil
+import numpy as np
+
+# MATLAB 시간별 결과(result.csv)를 서버에서 요약하는 후처리 모듈
+# 클라이언트가 8760행 전체를 받아서 직접 합산하던 것을 대신함 (RE100 보고용)
+
+HOURS_PER_YEAR = 8760
+MONTHS = list(range(1, 13))
+
+# 계절 구분 (한전 계시별 요금 기준)
+SEASON_OF_MONTH = {
+    1: "winter", 2: "winter", 3: "spring_fall", 4: "spring_fall", 5: "spring_fall",
+    6: "summer", 7: "summer", 8: "summer", 9: "spring_fall", 10: "spring_fall",
+    11: "winter", 12: "winter",
+}
+SEASONS = ["spring_fall", "summer", "winter"]
+
+# 계시별(TOU) 시간대 구분
+# 출처: 한국전력공사 기본공급약관 시행세칙 별표 - 계절별·시간대별 구분 (산업용(을)/일반용(을), 2023 개정)
+#   여름·봄가을  경부하 22:00~08:00 / 중간부하 08:00~11:00, 12:00~13:00, 18:00~22:00
+#                최대부하 11:00~12:00, 13:00~18:00
+#   겨울         경부하 22:00~08:00 / 중간부하 08:00~09:00, 12:00~16:00, 19:00~22:00
+#                최대부하 09:00~12:00, 16:00~19:00
+# 주말/공휴일 구분은 하지 않음 (기상 파일이 여러 연도를 섞은 표준기상년이라 요일이 의미 없음)
+TOU_PEAK_INTERVALS = {
+    "spring_fall": [(11, 12), (13, 18)],
+    "summer": [(11, 12), (13, 18)],
+    "winter": [(9, 12), (16, 19)],
+}
+TOU_OFF_PEAK_INTERVALS = [(22, 24), (0, 8)]
+TOU_BUCKETS = ["off_peak", "mid_peak", "on_peak"]
+
+
+def _interval_hours(intervals):
+    """[(시작, 끝), ...] -> 기상 파일의 시간 값 목록. 시간 h 는 h:00~h+1:00 구간 (h 시작 기준)"""
+    return sorted(h for start, end in intervals for h in range(start, end))
+
+
+TOU_PEAK_HOURS = {season: _interval_hours(iv) for season, iv in TOU_PEAK_INTERVALS.items()}
+TOU_OFF_PEAK_HOURS = _interval_hours(TOU_OFF_PEAK_INTERVALS)
+
+ALL_ROLLUPS = ["annual", "monthly", "seasonal", "tou", "peak", "capacity_factor", "re100"]
+
+CACHE_ROOT = "cache"
+
+# 기상 파일 경로별 시간 인덱스 (파일이 바뀌면 mtime/크기가 달라져 다시 읽음)
+_TIME_INDEX_CACHE = {}
+
+
+def load_time_index(weather_csv):
+    """기상 파일(RE100/*.csv)에서 월/시간 열을 읽어 시간별 인덱스를 만든다.
+
+    같은 파일은 (경로, 수정 시각, 크기) 기준으로 한 번만 읽음. 반환 배열은 읽기 전용.
+    """
+    path = os.path.abspath(weather_csv)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _TIME_INDEX_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    # 원본이 cp949 인코딩이라 헤더는 건너뛰고 위치(월=2, 시간=4)로 읽음
+    cols = np.loadtxt(path, delimiter=",", skiprows=1, usecols=(2, 4), dtype=np.int64,
+                      encoding="cp949", ndmin=2)
+    time_index = build_time_index(cols[:, 0], cols[:, 1])
+    for arr in time_index.values():
+        arr.flags.writeable = False
+    _TIME_INDEX_CACHE[path] = (stamp, time_index)
+    return time_index
+
+
+def build_time_index(month, hour):
+    """월(1~12)/시간(0~23) 배열 -> 계절/TOU 구분 코드를 포함한 시간별 인덱스"""
+    month = np.asarray(month, dtype=np.int64)
+    hour = np.asarray(hour, dtype=np.int64)
+
+    season_codes = np.array([SEASONS.index(SEASON_OF_MONTH[m]) for m in MONTHS])
+    season = season_codes[month - 1]
+
+    # 0: 경부하, 1: 중간부하, 2: 최대부하
+    tou = np.ones(len(hour), dtype=np.int64)
+    for s_idx, s_name in enumerate(SEASONS):
+        tou[(season == s_idx) & np.isin(hour, TOU_PEAK_HOURS[s_name])] = 2
+    tou[np.isin(hour, TOU_OFF_PEAK_HOURS)] = 0
+
+    return {"month": month, "hour": hour, "season": season, "tou": tou}
+
+
+def load_hourly_result(result_csv, value_column=None):
+    """result.csv(경로 또는 파일 객체)의 발전량 열을 float64 배열로 읽는다. 열 지정이 없으면 마지막 열 사용."""
+    import pandas as pd
+
+    df = pd.read_csv(result_csv)
+    col = value_column if value_column is not None else df.columns[-1]
+    if col not in df.columns:
+        raise ValueError(f"Column '{col}' not found in result CSV")
+
+    values = df[col].to_numpy(dtype=np.float64)
+    # NaN(미계산 시간)은 0으로 처리
+    return np.nan_to_num(values, nan=0.0)
+
+
+def _bucket_sum(values, codes, n_buckets):
+    return np.bincount(codes, weights=values, minlength=n_buckets)
+
+
+def compute_aggregates(generation, time_index, rollups=None, capacity_kw=None, load_profile=None):
+    """시간별 발전량(kWh)을 요청된 항목별로 요약한다.
+
+    rollups 가 None 이면 계산 가능한 전체 항목을 반환.
+    capacity_kw 는 이용률(capacity_factor), load_profile 은 RE100 달성률 계산에 필요.
+    """
+    rollups = list(ALL_ROLLUPS) if rollups is None else list(rollups)
+    unknown = [r for r in rollups if r not in ALL_ROLLUPS]
+    if unknown:
+        raise ValueError(f"Unknown rollup(s): {', '.join(unknown)}")
+
+    n = len(time_index["month"])
+    if len(generation) != n:
+        raise ValueError(f"Result has {len(generation)} rows but weather data has {n} hours")
+
+    total = float(generation.sum())
+    out = {}
+
+    if "annual" in rollups:
+        out["annual_kwh"] = total
+
+    if "monthly" in rollups:
+        monthly = _bucket_sum(generation, time_index["month"] - 1, 12)
+        out["monthly_kwh"] = {str(m): float(v) for m, v in zip(MONTHS, monthly)}
+
+    if "seasonal" in rollups:
+        seasonal = _bucket_sum(generation, time_index["season"], len(SEASONS))
+        out["seasonal_kwh"] = {s: float(v) for s, v in zip(SEASONS, seasonal)}
+
+    if "tou" in rollups:
+        tou = _bucket_sum(generation, time_index["tou"], len(TOU_BUCKETS))
+        out["tou_kwh"] = {b: float(v) for b, v in zip(TOU_BUCKETS, tou)}
+
+    if "peak" in rollups:
+        idx = int(np.argmax(generation))
+        hourly_profile = _bucket_sum(generation, time_index["hour"], 24)
+        out["peak"] = {
+            "kwh": float(generation[idx]),
+            "hour_of_year": idx,
+            "month": int(time_index["month"][idx]),
+            "hour": int(time_index["hour"][idx]),
+            "best_hour_of_day": int(np.argmax(hourly_profile)),
+        }
+
+    if "capacity_factor" in rollups:
+        if capacity_kw is None or capacity_kw <= 0:
+            out["capacity_factor"] = None
+        else:
+            out["capacity_factor"] = total / (float(capacity_kw) * n)
+
+    if "re100" in rollups:
+        if load_profile is None:
+            out["re100"] = None
+        else:
+            load = np.asarray(load_profile, dtype=np.float64)
+            if load.shape != generation.shape:
+                raise ValueError(f"Load profile must have {n} hourly values (got {load.size})")
+            load_total = float(load.sum())
+            # 시간 단위로 발전량 중 부하에 바로 쓰인 양 (자가소비)
+            self_consumed = float(np.minimum(generation, load).sum())
+            out["re100"] = {
+                "load_kwh": load_total,
+                "annual_coverage": total / load_total if load_total > 0 else None,
+                "hourly_matched_coverage": self_consumed / load_total if load_total > 0 else None,
+                "self_consumption_kwh": self_consumed,
+                "self_consumption_ratio": self_consumed / total if total > 0 else None,
+                "surplus_kwh": total - self_consumed,
+            }
+
+    return out
+
+
+# -------------------------------------------------------------
+# 캐시: cache/<building_id>/<입력 fingerprint>/result.csv + aggregates_<key>.json
+# -------------------------------------------------------------
+# 건물 형상/층수나 기상 파일이 바뀌면 fingerprint 가 달라지므로 예전 결과를 쓰지 않음
+def input_fingerprint(building_list, weather_csv):
+    """시뮬레이션 입력(주변 건물 목록 + 기상 파일)의 해시"""
+    h = hashlib.sha1()
+    for b in sorted(building_list, key=lambda b: (_geom_text(b["geom"]), b["height"], b["is_target"])):
+        h.update(f"{_geom_text(b['geom'])}|{b['height']:.3f}|{int(bool(b['is_target']))};".encode("utf-8"))
+    st = os.stat(weather_csv)
+    h.update(f"{os.path.basename(weather_csv)}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _geom_text(geom):
+    return geom.hex() if isinstance(geom, (bytes, bytearray, memoryview)) else str(geom)
+
+
+def aggregate_cache_key(rollups, capacity_kw, load_profile, value_column):
+    """요청 파라미터가 같으면 같은 키가 나오도록 해시"""
+    payload = json.dumps({
+        "rollups": sorted(rollups) if rollups is not None else None,
+        "capacity_kw": capacity_kw,
+        "load_profile": list(load_profile) if load_profile is not None else None,
+        "value_column": value_column,
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class LocalResultCache:
+    """프로세스가 있는 머신의 디스크에 저장하는 캐시 (단일 프로세스 모드용)"""
+
+    def __init__(self, root=CACHE_ROOT):
+        self.root = os.path.abspath(root)
+
+    def _dir(self, building_id, fingerprint):
+        return os.path.join(self.root, str(building_id), fingerprint)
+
+    def get_aggregates(self, building_id, fingerprint, key):
+        path = os.path.join(self._dir(building_id, fingerprint), f"aggregates_{key}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put_aggregates(self, building_id, fingerprint, key, aggregates):
+        cache_dir = self._dir(building_id, fingerprint)
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, f"aggregates_{key}.json")
+        # 쓰는 도중 다른 요청이 읽지 않도록 임시 파일 후 교체
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(aggregates, f)
+        os.replace(tmp_path, path)
+
+    def get_result(self, building_id, fingerprint):
+        """캐시된 result.csv 경로 (load_hourly_result 에 그대로 전달 가능). 없으면 None"""
+        path = os.path.join(self._dir(building_id, fingerprint), "result.csv")
+        return path if os.path.exists(path) else None
+
+    def put_result(self, building_id, fingerprint, result_csv):
+        cache_dir = self._dir(building_id, fingerprint)
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, "result.csv")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(result_csv, tmp_path)
+        os.replace(tmp_path, path)
+        self._prune(building_id, fingerprint)
+
+    def _prune(self, building_id, keep):
+        """건물 입력이 바뀌어 더 이상 쓰이지 않는 예전 fingerprint 폴더 삭제"""
+        building_dir = os.path.join(self.root, str(building_id))
+        for name in os.listdir(building_dir):
+            if name != keep:
+                shutil.rmtree(os.path.join(building_dir, name), ignore_errors=True)
@@ -0,0 +1,78 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# 기동 시간 벤치마크 (가짜 MATLAB Runtime 사용, Linux)
+#   python bench/bench_cold_start.py [반복 횟수]
+# 새 파이썬 프로세스에서 API/엔진 워커가 요청을 받기 전까지 하는 일을 잰다.
+#   app     : import main (uvicorn 이 워커를 띄울 때 불러오는 모듈 - FastAPI 앱, 라우트, 파이프라인 모듈)
+#             database 는 tests/db_stub.py 대역으로 바꿔 DB 연결 없이 잰다
+#   runtime : runtime_paths 설정 + SNUs_dsm2irrPkg import (단일 프로세스 모드 startup / 엔진 워커에서만)
+#   eager   : 예전처럼 pandas / cv2 / shapely / pyproj 를 모듈 로딩 시 import 했다면 추가됐을 시간
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from runtime_stub import make_runtime
+
+HEAVY = ["pandas", "cv2", "shapely", "pyproj"]
+
+CHILD = """
+import json, sys, time
+import db_stub
+db_stub.install()
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+loaded = [m for m in %(heavy)r + ["SNUs_dsm2irrPkg", "matlab"] if m in sys.modules]
+import runtime_paths
+runtime_paths.setup_runtime_paths()
+import SNUs_dsm2irrPkg
+t2 = time.perf_counter()
+eager = 0.0
+for name in %(heavy)r:
+    t = time.perf_counter()
+    try:
+        __import__(name)
+    except ImportError:
+        continue
+    eager += time.perf_counter() - t
+print(json.dumps({"app": t1 - t0, "runtime": t2 - t1, "eager": eager, "loaded_at_startup": loaded}))
+""" % {"heavy": HEAVY}
+
+
+def run_once(env, cwd):
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, cwd=cwd,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_runtime(os.path.join(tmp, "R2025a"))
+        env = dict(os.environ,
+                   MATLAB_RUNTIME_CACHE=os.path.join(tmp, "cache.json"),
+                   LD_LIBRARY_PATH=os.path.join(root, "runtime", "glnxa64"),
+                   PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "tests"),
+                                               os.path.join(ROOT, "SNUs_dsm2irrPkgpythonPackage")]))
+        for name in ("MATLAB_RUNTIME_ROOT", "SIM_JOB_STORE"):
+            env.pop(name, None)
+
+        first = run_once(env, tmp)  # 캐시 없음
+        runs = [run_once(env, tmp) for _ in range(repeat)]
+
+    def ms(key, rows):
+        return statistics.median(r[key] for r in rows) * 1000
+
+    print(f"cold start with stub runtime (median of {repeat}, first run without cache shown separately)")
+    print(f"  first run  app {first['app'] * 1000:7.1f} ms  runtime {first['runtime'] * 1000:7.1f} ms")
+    print(f"  cached     app {ms('app', runs):7.1f} ms  runtime {ms('runtime', runs):7.1f} ms")
+    print(f"  deferred heavy imports would add {ms('eager', runs):7.1f} ms")
+    print(f"  heavy modules loaded before first request: {runs[-1]['loaded_at_startup'] or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import tempfile
+import multiprocessing as mp
+
+# 작업 큐 부하 테스트 (가짜 엔진 사용 - MATLAB/DB 불필요)
+#   python bench/bench_job_queue.py [작업 수] [작업당 엔진 시간(초)] [워커 수 목록, 예: 1,2,4,8] [저장소]
+# 엔진 워커 N 개가 같은 저장소에서 claim -> (sleep 으로 흉내낸 MATLAB 실행, 중간에 heartbeat 1회)
+# -> complete 를 반복. 워커 수별 처리량(jobs/s)과, 모든 작업이 정확히 한 번씩 완료됐는지 확인한다.
+# 저장소: 생략하면 임시 SQLite 파일, redis://host:6379/0 을 주면 Redis (실행마다 새 prefix 사용)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from job_queue import REDIS_SCHEMES, open_store
+
+
+def connect(url, prefix):
+    return open_store(url, prefix=prefix) if url.startswith(REDIS_SCHEMES) else open_store(url)
+
+
+def stub_worker(url, prefix, name, engine_sec, accepted):
+    store = connect(url, prefix)
+    n = 0
+    while True:
+        job = store.claim(name)
+        if job is None:
+            break
+        # MATLAB 실행 대신
+        time.sleep(engine_sec / 2)
+        store.heartbeat(job["id"], name)
+        time.sleep(engine_sec / 2)
+        if store.complete(job["id"], name, {"building_id": job["building_id"], "worker": name}):
+            n += 1
+    accepted.put(n)
+
+
+def run(n_jobs, engine_sec, n_workers, store_url=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = store_url or os.path.join(tmp, "jobs.sqlite3")
+        prefix = f"bench-{os.getpid()}-{n_workers}-{time.time_ns()}"
+        store = connect(url, prefix)
+        ids = [store.enqueue(i, {"rollups": ["annual"]}) for i in range(n_jobs)]
+
+        accepted = mp.Queue()
+        procs = [mp.Process(target=stub_worker, args=(url, prefix, f"w{i}", engine_sec, accepted))
+                 for i in range(n_workers)]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        completed = sum(accepted.get() for _ in procs)
+        counts = store.counts()
+        retried = sum(store.get(job_id)["attempts"] != 1 for job_id in ids)
+        if hasattr(store, "redis"):
+            for key in store.redis.scan_iter(f"{prefix}:*"):
+                store.redis.delete(key)
+    exactly_once = completed == n_jobs and counts == {"done": n_jobs} and retried == 0
+    return n_jobs / elapsed, elapsed, exactly_once
+
+
+def main():
+    n_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    engine_sec = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    workers = [int(w) for w in sys.argv[3].split(",")] if len(sys.argv) > 3 else [1, 2, 4, 8]
+    store_url = sys.argv[4] if len(sys.argv) > 4 else None
+
+    print(f"job queue load test: {n_jobs} jobs, stub engine {engine_sec * 1000:.0f} ms/job, "
+          f"store {store_url or 'sqlite (temp file)'}")
+    print(f"  ideal per worker: {1 / engine_sec:.1f} jobs/s")
+    for n in workers:
+        rate, elapsed, ok = run(n_jobs, engine_sec, n, store_url)
+        print(f"  workers {n:2d}: {rate:6.1f} jobs/s ({elapsed:5.2f} s)  exactly-once: {'ok' if ok else 'FAILED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# NumPy -> matlab.double 변환 벤치마크 (1000x1000 DSM, matlab 모듈 대역 사용)
+#   python bench/bench_matlab_arrays.py [크기]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import matlab_arrays
+from matlab_stub import make_matlab
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    dsm = np.random.default_rng(0).random((n, n)) * 30.0
+
+    naive_ml = make_matlab("list")
+    naive = best_of(lambda: naive_ml.double(dsm.tolist()))
+    print(f"{n}x{n} float64 -> matlab.double")
+    print(f"  {'naive tolist()':<16} {naive * 1000:9.1f} ms")
+
+    for mode in ("buffer", "vector", "list"):
+        ml = make_matlab(mode)
+        assert matlab_arrays.conversion_mode(ml) == mode
+        to_m = best_of(lambda: matlab_arrays.to_matlab_double(dsm, ml))
+        m = matlab_arrays.to_matlab_double(dsm, ml)
+        back = best_of(lambda: matlab_arrays.from_matlab(m))
+        assert np.array_equal(matlab_arrays.from_matlab(m), dsm)
+        print(f"  {mode:<16} {to_m * 1000:9.1f} ms  (back {back * 1000:.1f} ms, x{naive / to_m:.1f} vs naive)")
+
+
+if __name__ == "__main__":
+    main()
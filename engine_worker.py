@@ -0,0 +1,138 @@
+import os
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+
+# -------------------------------------------------------------
+# 엔진 워커: 공유 작업 큐(job_queue.JobStore)에서 작업을 가져와 MATLAB 시뮬레이션 실행
+# -------------------------------------------------------------
+# MATLAB 런타임은 프로세스당 하나라서 워커 1개 = 동시 실행 1건.
+# 처리량을 늘리려면 이 프로세스를 여러 개 띄우면 됨. 다른 노드에서 띄울 때는 Redis 저장소를 사용
+#   SIM_JOB_STORE=redis://queue-host:6379/0 python engine_worker.py
+#   SIM_JOB_STORE=/var/lib/dsm2irr/jobs.sqlite3 python engine_worker.py   (한 머신 안에서만)
+from database import SessionLocal
+from runtime_paths import setup_runtime_paths
+from job_queue import open_store, worker_name
+from simulation import AggregationRequest, SimulationError, simulate_building
+from workspace import WorkspaceManager
+
+POLL_INTERVAL_SEC = float(os.environ.get("SIM_WORKER_POLL_SEC", 0.5))
+# lease 만료 작업 확인 / 끝난 작업·캐시 정리 주기
+REQUEUE_INTERVAL_SEC = 60
+# 저장소 오류(예: database is locked, Redis 연결 끊김) 시 재시도 대기 (지수 증가, 최대값)
+ERROR_BACKOFF_MAX_SEC = 30
+
+
+@contextmanager
+def keep_lease(store, job_id, worker):
+    """실행하는 동안 lease_sec / 3 마다 heartbeat -> 오래 걸리는 작업이 다른 워커에 넘어가지 않음"""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(store.lease_sec / 3):
+            try:
+                if not store.heartbeat(job_id, worker):
+                    print(f">>> [Worker {worker}] Lease lost for job {job_id}")
+                    return
+            except Exception as e:
+                # 일시적인 저장소 오류면 다음 주기에 다시 시도 (lease 안에 성공하면 됨)
+                print(f">>> [Warning] Heartbeat failed for job {job_id}: {e}")
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def process_job(store, job, worker, matlab_pkg, matlab, workspace_manager):
+    """작업 하나 실행 후 결과 기록. lease 를 잃어 기록하지 못했으면 False
+
+    요약 캐시는 작업 저장소에 둠 -> API 서버/다른 워커와 공유
+    """
+    db = SessionLocal()
+    try:
+        with keep_lease(store, job["id"], worker):
+            payload = job["payload"]
+            agg = AggregationRequest(**payload) if payload is not None else None
+            result = simulate_building(matlab_pkg, matlab, db, workspace_manager, store, job["building_id"], agg)
+    except SimulationError as e:
+        recorded = store.fail(job["id"], worker, e.status_code, e.detail)
+    except Exception as e:
+        recorded = store.fail(job["id"], worker, 500, f"Simulation Engine Error: {str(e)}")
+    else:
+        recorded = store.complete(job["id"], worker, result)
+    finally:
+        db.close()
+
+    if not recorded:
+        print(f">>> [Worker {worker}] Lease lost for job {job['id']} (result discarded)")
+    return recorded
+
+
+def housekeeping(store, name):
+    requeued, failed = store.requeue_stale()
+    if requeued or failed:
+        print(f">>> [Worker {name}] Stale jobs: {requeued} requeued, {failed} failed (max attempts)")
+    jobs, cached = store.purge()
+    if jobs or cached:
+        print(f">>> [Worker {name}] Purged {jobs} finished job(s), {cached} cache entries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MATLAB simulation engine worker")
+    parser.add_argument("--store", default=None,
+                        help="job store: redis:// URL or SQLite file path (default: SIM_JOB_STORE)")
+    parser.add_argument("--max-jobs", type=int, default=0, help="exit after N jobs (0: run forever)")
+    args = parser.parse_args()
+
+    store = open_store(args.store)
+    name = worker_name()
+
+    workspace_manager = WorkspaceManager()
+    removed = workspace_manager.sweep_orphans()
+    workspace_manager.preallocate()
+    print(f">>> [Worker {name}] Workspace root: {workspace_manager.root} (orphans removed: {removed})")
+
+    print(f">>> [Worker {name}] Initializing MATLAB Runtime... (This takes 10-20 sec)")
+    setup_runtime_paths()
+    import SNUs_dsm2irrPkg  # <-- 이걸 먼저 불러야 matlab 모듈 경로가 잡힘
+    import matlab
+    matlab_pkg = SNUs_dsm2irrPkg.initialize()
+    print(f">>> [Worker {name}] MATLAB Initialized. Polling {store.location}")
+
+    done = 0
+    last_housekeeping = 0.0
+    backoff = POLL_INTERVAL_SEC
+    try:
+        while not args.max_jobs or done < args.max_jobs:
+            try:
+                if time.time() - last_housekeeping > REQUEUE_INTERVAL_SEC:
+                    housekeeping(store, name)
+                    last_housekeeping = time.time()
+
+                job = store.claim(name)
+                backoff = POLL_INTERVAL_SEC
+                if job is None:
+                    time.sleep(POLL_INTERVAL_SEC)
+                    continue
+
+                process_job(store, job, name, matlab_pkg, matlab, workspace_manager)
+                done += 1
+            except Exception as e:
+                # 저장소 오류로 워커(와 MATLAB)를 내리지 않음. 결과를 못 남긴 작업은 lease 만료 후 재시도됨
+                print(f">>> [Error] Job store error: {e} (retry in {backoff:.1f}s)")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, ERROR_BACKOFF_MAX_SEC)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        matlab_pkg.terminate()
+        print(f">>> [Worker {name}] MATLAB Terminated.")
+
+
+if __name__ == "__main__":
+    main()
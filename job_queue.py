@@ -0,0 +1,550 @@
+import io
+import os
+import json
+import time
+import socket
+import sqlite3
+from contextlib import contextmanager
+
+# API 서버와 엔진 워커가 공유하는 작업 큐 + 결과 저장소
+# - API 서버(uvicorn 워커 여러 개 가능): enqueue() 후 get() 으로 결과 확인
+# - 엔진 워커(engine_worker.py, 여러 프로세스/노드 가능): claim() 으로 작업을 가져가
+#   실행 중에는 heartbeat() 로 lease 를 연장하고, 끝나면 complete()/fail()
+# - 요약 결과 캐시(get/put_aggregates, get/put_result)도 같은 저장소에 둠 -> 모든 프로세스가 공유
+#
+# 저장소는 SIM_JOB_STORE 값으로 고름 (open_store)
+#   redis://host:6379/0, rediss://..., unix://... : RedisJobStore (여러 노드용, redis 패키지 필요)
+#   sqlite:///경로 또는 파일 경로                  : SQLiteJobStore (한 머신 전용 - WAL 모드는 공유 메모리를
+#                                                    쓰므로 NFS/SMB 같은 네트워크 파일시스템에서는 안전하지 않음)
+
+DEFAULT_STORE = os.environ.get("SIM_JOB_STORE") or "jobs.sqlite3"
+# 이 시간 동안 heartbeat 가 없는 running 작업은 워커가 죽은 것으로 보고 다시 대기열로
+DEFAULT_LEASE_SEC = float(os.environ.get("SIM_JOB_LEASE_SEC", 600))
+# 이 횟수만큼 가져간 뒤에도 끝나지 않으면(예: MATLAB 이 매번 프로세스를 죽임) failed 로 처리
+DEFAULT_MAX_ATTEMPTS = int(os.environ.get("SIM_JOB_MAX_ATTEMPTS", 3))
+# 끝난 작업(done/failed)은 이 시간이 지나면 purge() 에서 삭제 (응답 전체가 저장되므로)
+DEFAULT_RETENTION_SEC = float(os.environ.get("SIM_JOB_RETENTION_SEC", 24 * 3600))
+# 요약 결과 캐시 보관 기간. 건물 입력이 바뀌면(fingerprint 변경) 예전 결과는 바로 삭제
+DEFAULT_CACHE_TTL_SEC = float(os.environ.get("SIM_CACHE_TTL_SEC", 30 * 24 * 3600))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+REDIS_SCHEMES = ("redis://", "rediss://", "unix://")
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def open_store(url=None, **kwargs):
+    """SIM_JOB_STORE 값(URL 또는 SQLite 파일 경로)에 맞는 저장소"""
+    url = url or DEFAULT_STORE
+    if url.startswith(REDIS_SCHEMES):
+        return RedisJobStore(url, **kwargs)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteJobStore(url, **kwargs)
+
+
+def _max_attempts_error(max_attempts):
+    return f"Simulation Engine Error: job did not finish after {max_attempts} attempts"
+
+
+class JobStore:
+    """작업 큐 + 요약 결과 캐시 인터페이스 (SQLiteJobStore, RedisJobStore 가 구현)
+
+    complete()/fail()/heartbeat() 은 작업을 가져간 워커가 아직 lease 를 갖고 있을 때만 반영되고,
+    lease 가 만료돼 다시 대기열로 갔거나 다른 워커가 가져갔다면 False 를 반환함.
+    """
+
+    location = None
+
+    def __init__(self, lease_sec=DEFAULT_LEASE_SEC, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 retention_sec=DEFAULT_RETENTION_SEC, cache_ttl_sec=DEFAULT_CACHE_TTL_SEC):
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self.retention_sec = retention_sec
+        self.cache_ttl_sec = cache_ttl_sec
+
+    # --- 작업 큐 ---
+    def enqueue(self, building_id, payload=None):
+        """대기열에 추가 -> 작업 id"""
+        raise NotImplementedError
+
+    def claim(self, worker=None):
+        """가장 오래된 대기 작업 하나를 running 으로 바꾸고 {"id", "building_id", "payload"} 반환. 없으면 None"""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id, worker):
+        """실행 중인 작업의 lease 연장"""
+        raise NotImplementedError
+
+    def complete(self, job_id, worker, result):
+        raise NotImplementedError
+
+    def fail(self, job_id, worker, error_code, error):
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """작업 상태 (done 이면 result, failed 면 error_code/error 포함). 없으면 None"""
+        raise NotImplementedError
+
+    def requeue_stale(self):
+        """lease 가 만료된 running 작업을 다시 대기열로 (워커 비정상 종료 복구)
+
+        이미 max_attempts 번 가져간 작업은 다시 넣지 않고 failed 로 처리. 반환: (재시도, 실패) 개수
+        """
+        raise NotImplementedError
+
+    def purge(self):
+        """retention_sec 이 지난 끝난 작업과 cache_ttl_sec 이 지난 캐시 삭제. 반환: (작업, 캐시) 개수"""
+        raise NotImplementedError
+
+    def counts(self):
+        """상태별 작업 수"""
+        raise NotImplementedError
+
+    # --- 요약 결과 캐시 (aggregation.LocalResultCache 와 같은 인터페이스) ---
+    def get_aggregates(self, building_id, fingerprint, key):
+        raise NotImplementedError
+
+    def put_aggregates(self, building_id, fingerprint, key, aggregates):
+        raise NotImplementedError
+
+    def get_result(self, building_id, fingerprint):
+        """캐시된 result.csv 내용 (파일 객체, load_hourly_result 에 그대로 전달 가능). 없으면 None"""
+        raise NotImplementedError
+
+    def put_result(self, building_id, fingerprint, result_csv):
+        """result.csv 저장. 같은 건물의 예전 fingerprint 결과/요약은 삭제"""
+        raise NotImplementedError
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    building_id INTEGER NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    error_code INTEGER,
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS result_cache (
+    building_id INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    result_csv TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (building_id, fingerprint)
+);
+CREATE TABLE IF NOT EXISTS aggregate_cache (
+    building_id INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    cache_key TEXT NOT NULL,
+    aggregates TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (building_id, fingerprint, cache_key)
+);
+"""
+
+
+class SQLiteJobStore(JobStore):
+    """SQLite 파일 저장소 (한 머신 전용)"""
+
+    def __init__(self, path=None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = os.path.abspath(path or DEFAULT_STORE)
+        self.location = self.path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 연결은 호출마다 새로 만듦 (스레드/프로세스 간 공유하지 않기 위해)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            # IMMEDIATE: 쓰기 잠금을 먼저 잡아서 두 워커가 같은 작업을 가져가지 않게 함
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, building_id, payload=None):
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (building_id, payload, status, created_at) VALUES (?, ?, ?, ?)",
+                (building_id, json.dumps(payload) if payload is not None else None, QUEUED, time.time()))
+            return cur.lastrowid
+
+    def claim(self, worker=None):
+        worker = worker or worker_name()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (QUEUED,)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, worker, time.time(), row["id"]))
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "building_id": row["building_id"],
+            "payload": json.loads(row["payload"]) if row["payload"] else None,
+        }
+
+    def _update_running(self, job_id, worker, assignments, values):
+        with self._connect() as conn:
+            cur = conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND status = ? AND worker = ?",
+                (*values, job_id, RUNNING, worker))
+            return cur.rowcount == 1
+
+    def heartbeat(self, job_id, worker):
+        return self._update_running(job_id, worker, "started_at = ?", (time.time(),))
+
+    def complete(self, job_id, worker, result):
+        return self._update_running(
+            job_id, worker, "status = ?, result = ?, finished_at = ?", (DONE, json.dumps(result), time.time()))
+
+    def fail(self, job_id, worker, error_code, error):
+        return self._update_running(
+            job_id, worker, "status = ?, error_code = ?, error = ?, finished_at = ?",
+            (FAILED, error_code, error, time.time()))
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "building_id": row["building_id"],
+            "status": row["status"],
+            "worker": row["worker"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["status"] == DONE:
+            job["result"] = json.loads(row["result"])
+        elif row["status"] == FAILED:
+            job["error_code"] = row["error_code"]
+            job["error"] = row["error"]
+        return job
+
+    def requeue_stale(self):
+        now = time.time()
+        expired = now - self.lease_sec
+        with self._transaction() as conn:
+            failed = conn.execute(
+                "UPDATE jobs SET status = ?, error_code = 500, error = ?, finished_at = ? "
+                "WHERE status = ? AND started_at < ? AND attempts >= ?",
+                (FAILED, _max_attempts_error(self.max_attempts), now, RUNNING, expired, self.max_attempts)).rowcount
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, started_at = NULL WHERE status = ? AND started_at < ?",
+                (QUEUED, RUNNING, expired)).rowcount
+        return requeued, failed
+
+    def purge(self):
+        now = time.time()
+        with self._transaction() as conn:
+            jobs = conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, now - self.retention_sec)).rowcount
+            cache_cutoff = now - self.cache_ttl_sec
+            cached = conn.execute("DELETE FROM result_cache WHERE created_at < ?", (cache_cutoff,)).rowcount
+            cached += conn.execute("DELETE FROM aggregate_cache WHERE created_at < ?", (cache_cutoff,)).rowcount
+        return jobs, cached
+
+    def counts(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def get_aggregates(self, building_id, fingerprint, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT aggregates FROM aggregate_cache WHERE building_id = ? AND fingerprint = ? AND cache_key = ?",
+                (building_id, fingerprint, key)).fetchone()
+        return json.loads(row["aggregates"]) if row else None
+
+    def put_aggregates(self, building_id, fingerprint, key, aggregates):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO aggregate_cache VALUES (?, ?, ?, ?, ?)",
+                (building_id, fingerprint, key, json.dumps(aggregates), time.time()))
+
+    def get_result(self, building_id, fingerprint):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result_csv FROM result_cache WHERE building_id = ? AND fingerprint = ?",
+                (building_id, fingerprint)).fetchone()
+        return io.StringIO(row["result_csv"]) if row else None
+
+    def put_result(self, building_id, fingerprint, result_csv):
+        with open(result_csv, "r", encoding="utf-8") as f:
+            text = f.read()
+        with self._transaction() as conn:
+            for table in ("result_cache", "aggregate_cache"):
+                conn.execute(f"DELETE FROM {table} WHERE building_id = ? AND fingerprint != ?",
+                             (building_id, fingerprint))
+            conn.execute(
+                "INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?, ?)",
+                (building_id, fingerprint, text, time.time()))
+
+
+class RedisJobStore(JobStore):
+    """Redis(또는 호환 서버) 저장소 - 여러 노드의 API 서버/엔진 워커가 같은 큐를 씀
+
+    키 (prefix 기본 "sim", SIM_JOB_STORE_PREFIX 로 변경)
+      <p>:seq                 작업 id 발급 (INCR)
+      <p>:job:<id>            작업 hash (SQLite jobs 테이블과 같은 필드)
+      <p>:queued              대기 작업 id 목록 (LPUSH 로 넣고 RPOP 으로 꺼냄, 재시도는 RPUSH 로 맨 앞에)
+      <p>:running             running 작업 id -> 마지막 heartbeat 시각 (sorted set)
+      <p>:done, <p>:failed    끝난 작업 id -> 끝난 시각 (sorted set, purge 용)
+      <p>:result:<건물>       {"fingerprint", "csv"} hash, <p>:agg:<건물> 는 fingerprint 별 요약 hash
+    상태 변경은 WATCH/MULTI 트랜잭션으로 처리 (Lua 스크립트 없이 Redis 호환 서버에서도 동작).
+    캐시 키는 cache_ttl_sec 만료(EXPIRE)로 정리됨.
+    """
+
+    def __init__(self, url=None, client=None, prefix=None, **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("redis package is required for SIM_JOB_STORE=redis://... (pip install redis)")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.redis = client
+        self.prefix = prefix or os.environ.get("SIM_JOB_STORE_PREFIX", "sim")
+        self.location = _strip_password(url) if url else f"redis ({self.prefix})"
+
+    def _key(self, *parts):
+        return ":".join([self.prefix, *map(str, parts)])
+
+    def _watch(self, keys, body):
+        """keys 를 WATCH 한 채로 body(pipe) 실행. 다른 클라이언트가 먼저 바꾸면 처음부터 다시"""
+        from redis.exceptions import WatchError
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(*keys)
+                    return body(pipe)
+                except WatchError:
+                    continue
+
+    def enqueue(self, building_id, payload=None):
+        job_id = self.redis.incr(self._key("seq"))
+        pipe = self.redis.pipeline()
+        pipe.hset(self._key("job", job_id), mapping={
+            "building_id": building_id,
+            "payload": json.dumps(payload) if payload is not None else "",
+            "status": QUEUED,
+            "attempts": 0,
+            "created_at": time.time(),
+        })
+        pipe.lpush(self._key("queued"), job_id)
+        pipe.execute()
+        return job_id
+
+    def claim(self, worker=None):
+        worker = worker or worker_name()
+        queued = self._key("queued")
+
+        def body(pipe):
+            ids = pipe.lrange(queued, -1, -1)
+            if not ids:
+                pipe.unwatch()
+                return None
+            job_id = int(ids[0])
+            job = pipe.hgetall(self._key("job", job_id))
+            now = time.time()
+            pipe.multi()
+            pipe.rpop(queued)
+            pipe.hset(self._key("job", job_id), mapping={"status": RUNNING, "worker": worker, "started_at": now})
+            pipe.hincrby(self._key("job", job_id), "attempts", 1)
+            pipe.zadd(self._key("running"), {job_id: now})
+            pipe.execute()
+            return {
+                "id": job_id,
+                "building_id": int(job["building_id"]),
+                "payload": json.loads(job["payload"]) if job.get("payload") else None,
+            }
+
+        return self._watch([queued], body)
+
+    def _update_running(self, job_id, worker, fields, finished=None):
+        job_key = self._key("job", job_id)
+
+        def body(pipe):
+            status, owner = pipe.hmget(job_key, "status", "worker")
+            if status != RUNNING or owner != worker:
+                pipe.unwatch()
+                return False
+            now = time.time()
+            pipe.multi()
+            if finished is None:
+                pipe.hset(job_key, mapping=dict(fields, started_at=now))
+                pipe.zadd(self._key("running"), {job_id: now})
+            else:
+                pipe.hset(job_key, mapping=dict(fields, status=finished, finished_at=now))
+                pipe.zrem(self._key("running"), job_id)
+                pipe.zadd(self._key(finished), {job_id: now})
+            pipe.execute()
+            return True
+
+        return self._watch([job_key], body)
+
+    def heartbeat(self, job_id, worker):
+        return self._update_running(job_id, worker, {})
+
+    def complete(self, job_id, worker, result):
+        return self._update_running(job_id, worker, {"result": json.dumps(result)}, finished=DONE)
+
+    def fail(self, job_id, worker, error_code, error):
+        return self._update_running(job_id, worker, {"error_code": error_code, "error": error}, finished=FAILED)
+
+    def get(self, job_id):
+        row = self.redis.hgetall(self._key("job", job_id))
+        if not row:
+            return None
+
+        def num(name, cast=float):
+            return cast(row[name]) if row.get(name) else None
+
+        job = {
+            "job_id": int(job_id),
+            "building_id": int(row["building_id"]),
+            "status": row["status"],
+            "worker": row.get("worker") or None,
+            "attempts": int(row.get("attempts", 0)),
+            "created_at": num("created_at"),
+            "started_at": num("started_at"),
+            "finished_at": num("finished_at"),
+        }
+        if row["status"] == DONE:
+            job["result"] = json.loads(row["result"])
+        elif row["status"] == FAILED:
+            job["error_code"] = num("error_code", int)
+            job["error"] = row.get("error")
+        return job
+
+    def requeue_stale(self):
+        now = time.time()
+        expired = now - self.lease_sec
+        requeued = failed = 0
+        for job_id in self.redis.zrangebyscore(self._key("running"), "-inf", f"({expired}"):
+            job_key = self._key("job", job_id)
+
+            def body(pipe):
+                status, started_at, attempts = pipe.hmget(job_key, "status", "started_at", "attempts")
+                if status == RUNNING and float(started_at) >= expired:
+                    # 그 사이에 heartbeat 로 연장됨
+                    pipe.unwatch()
+                    return None
+                pipe.multi()
+                pipe.zrem(self._key("running"), job_id)
+                if status != RUNNING:
+                    # 이미 끝났거나 사라진 작업 (목록만 정리)
+                    pipe.execute()
+                    return None
+                if int(attempts) >= self.max_attempts:
+                    pipe.hset(job_key, mapping={"status": FAILED, "error_code": 500, "finished_at": now,
+                                                "error": _max_attempts_error(self.max_attempts)})
+                    pipe.zadd(self._key(FAILED), {job_id: now})
+                    pipe.execute()
+                    return FAILED
+                pipe.hset(job_key, mapping={"status": QUEUED, "worker": "", "started_at": ""})
+                pipe.rpush(self._key("queued"), job_id)
+                pipe.execute()
+                return QUEUED
+
+            outcome = self._watch([job_key], body)
+            requeued += outcome == QUEUED
+            failed += outcome == FAILED
+        return requeued, failed
+
+    def purge(self):
+        cutoff = time.time() - self.retention_sec
+        removed = 0
+        for status in (DONE, FAILED):
+            ids = self.redis.zrangebyscore(self._key(status), "-inf", f"({cutoff}")
+            if not ids:
+                continue
+            pipe = self.redis.pipeline()
+            pipe.delete(*[self._key("job", job_id) for job_id in ids])
+            pipe.zrem(self._key(status), *ids)
+            pipe.execute()
+            removed += len(ids)
+        # 캐시는 EXPIRE 로 Redis 가 직접 삭제
+        return removed, 0
+
+    def counts(self):
+        pipe = self.redis.pipeline()
+        pipe.llen(self._key("queued"))
+        for status in (RUNNING, DONE, FAILED):
+            pipe.zcard(self._key(status))
+        values = pipe.execute()
+        return {status: n for status, n in zip((QUEUED, RUNNING, DONE, FAILED), values) if n}
+
+    def get_aggregates(self, building_id, fingerprint, key):
+        value = self.redis.hget(self._key("agg", building_id, fingerprint), key)
+        return json.loads(value) if value is not None else None
+
+    def put_aggregates(self, building_id, fingerprint, key, aggregates):
+        agg_key = self._key("agg", building_id, fingerprint)
+        pipe = self.redis.pipeline()
+        pipe.hset(agg_key, key, json.dumps(aggregates))
+        pipe.expire(agg_key, int(self.cache_ttl_sec))
+        pipe.execute()
+
+    def get_result(self, building_id, fingerprint):
+        cached_fp, text = self.redis.hmget(self._key("result", building_id), "fingerprint", "csv")
+        return io.StringIO(text) if cached_fp == fingerprint and text is not None else None
+
+    def put_result(self, building_id, fingerprint, result_csv):
+        with open(result_csv, "r", encoding="utf-8") as f:
+            text = f.read()
+        result_key = self._key("result", building_id)
+        old_fp = self.redis.hget(result_key, "fingerprint")
+        pipe = self.redis.pipeline()
+        if old_fp and old_fp != fingerprint:
+            pipe.delete(self._key("agg", building_id, old_fp))
+        pipe.hset(result_key, mapping={"fingerprint": fingerprint, "csv": text})
+        pipe.expire(result_key, int(self.cache_ttl_sec))
+        pipe.execute()
+
+
+def _strip_password(url):
+    """로그 출력용 URL (비밀번호 제거)"""
+    scheme, sep, rest = url.partition("://")
+    if "@" not in rest:
+        return url
+    creds, _, host = rest.rpartition("@")
+    user = creds.split(":", 1)[0]
+    return f"{scheme}{sep}{user + '@' if user else ''}{host}"
@@ -1,57 +1,78 @@
 import os
-import sys
 
 # -------------------------------------------------------------
-# [1] MATLAB Runtime 경로 설정 (두 곳 모두 필요!)
+# [1] 라이브러리 임포트
 # -------------------------------------------------------------
-# 1. libmx.dll 등이 있는 곳
-path_bin = r"C:\Program Files\MATLAB\MATLAB Runtime\R2025a\bin\win64"
-# 2. mclmcrrt25_1.dll (핵심 파일)이 있는 곳
-path_runtime = r"C:\Program Files\MATLAB\MATLAB Runtime\R2025a\runtime\win64"
-
-# 두 경로를 모두 환경 변수 PATH에 추가
-os.environ['PATH'] = path_bin + os.pathsep + path_runtime + os.pathsep + os.environ['PATH']
-
-# Python 3.8+ 보안 해제 (두 경로 모두 허용)
-if hasattr(os, 'add_dll_directory'):
-    try:
-        if os.path.exists(path_bin): os.add_dll_directory(path_bin)
-        if os.path.exists(path_runtime): os.add_dll_directory(path_runtime)
-    except Exception as e:
-        print(f">>> [Warning] DLL path add failed: {e}")
-
-# -------------------------------------------------------------
-# [2] 라이브러리 임포트
-# -------------------------------------------------------------
-import SNUs_dsm2irrPkg  # 이제 runtime 폴더를 찾을 수 있어서 성공할 겁니다!
-import matlab
-
-
+# SNUs_dsm2irrPkg / matlab / pandas / cv2 / shapely 는 무거워서 처음 사용할 때 불러옴
+# (워커 재시작·오토스케일링 시 기동 시간 단축)
+# MATLAB Runtime 경로 설정도 MATLAB 을 직접 띄우는 단일 프로세스 모드의 startup 에서만 함
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 import asyncio
-import uuid
-import pandas as pd
-import shutil
-
-import SNUs_dsm2irrPkg  # <-- 이걸 먼저 쓰세요 (환경 로딩 유도)
-import matlab           # <-- 그 다음에 matlab 타입 정의 불러오기
+import time
 
 from database import get_db
-from utils import create_simulation_inputs
+from runtime_paths import setup_runtime_paths
+from workspace import WorkspaceManager
+from aggregation import LocalResultCache, input_fingerprint
+from simulation import (
+    WEATHER_CSV, AggregationRequest, SimulationError,
+    cached_summary, load_buildings, prepare_inputs, run_engine, collect_results, build_response,
+)
 
 app = FastAPI()
 
-# MATLAB 엔진 관리
+# -------------------------------------------------------------
+# 실행 모드
+# -------------------------------------------------------------
+# - SIM_JOB_STORE 미지정: 단일 프로세스 모드 (이 프로세스가 MATLAB 직접 실행, 워커 1개)
+# - SIM_JOB_STORE 지정  : API 전용 모드 (작업을 공유 큐에 넣고 engine_worker.py 가 실행)
+#                         MATLAB 을 띄우지 않으므로 uvicorn 워커 수 제한 없음
+#                         값은 redis:// URL(여러 노드) 또는 SQLite 파일 경로(한 머신) - job_queue.open_store
+JOB_STORE_URL = os.environ.get("SIM_JOB_STORE")
+JOB_POLL_INTERVAL_SEC = 0.5
+
+job_store = None
+if JOB_STORE_URL:
+    from job_queue import open_store
+    job_store = open_store(JOB_STORE_URL)
+
+# /simulate 대기 시간. 실행 중인 작업은 워커가 heartbeat 로 lease 를 연장하므로 lease 와 무관하게
+# 끝까지 실행됨 - 이 시간을 넘기면 504 응답 후 GET /jobs/{job_id} 로 계속 확인 가능
+JOB_WAIT_TIMEOUT_SEC = float(os.environ.get("SIM_JOB_TIMEOUT_SEC", 900))
+
+# MATLAB 엔진 관리 (matlab 모듈은 startup 에서 SNUs_dsm2irrPkg 로딩 후 채워짐)
 matlab_pkg = None
+matlab = None
 engine_lock = asyncio.Lock()
 
+# 요청별 임시 작업 폴더 관리 (tmpfs 우선, 용량 제한, 슬롯 재사용)
+workspace_manager = WorkspaceManager()
+
+# 요약 결과 캐시 (단일 프로세스 모드 - API 전용 모드에서는 엔진 워커가 작업 저장소의 캐시를 확인)
+result_cache = LocalResultCache()
+
 @app.on_event("startup")
 def startup_event():
-    global matlab_pkg
+    global matlab_pkg, matlab
+    if job_store is not None:
+        print(f">>> [System] API-only mode. Jobs are queued to {job_store.location}")
+        return
+
+    removed = workspace_manager.sweep_orphans()
+    workspace_manager.preallocate()
+    print(f">>> [System] Workspace root: {workspace_manager.root} (orphans removed: {removed})")
+
     print(">>> [System] Initializing MATLAB Runtime... (This takes 10-20 sec)")
     try:
+        # 설치 위치는 MATLAB_RUNTIME_ROOT 환경변수 또는 OS별 기본 위치에서 찾고 결과를 캐시함
+        # (Windows: PATH, Linux: LD_LIBRARY_PATH, Mac: DYLD_LIBRARY_PATH)
+        setup_runtime_paths()
+        import SNUs_dsm2irrPkg  # <-- 이걸 먼저 불러야 matlab 모듈 경로가 잡힘
+        import matlab as matlab_module
+        matlab = matlab_module
         matlab_pkg = SNUs_dsm2irrPkg.initialize()
         print(">>> [System] MATLAB Initialized Successfully.")
     except Exception as e:
@@ -66,102 +87,99 @@ def shutdown_event():
         matlab_pkg.terminate()
         print(">>> [System] MATLAB Terminated.")
 
+@app.get("/metrics/workspace")
+def workspace_metrics():
+    return workspace_manager.metrics()
+
+
+def require_job_store():
+    if job_store is None:
+        raise HTTPException(status_code=404, detail="Job queue is not enabled (set SIM_JOB_STORE).")
+    return job_store
+
+
+@app.post("/jobs/{building_id}", status_code=202)
+def submit_job(building_id: int, agg: Optional[AggregationRequest] = None):
+    store = require_job_store()
+    job_id = store.enqueue(building_id, agg.model_dump() if agg is not None else None)
+    return {"job_id": job_id, "building_id": building_id, "status": "queued"}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int):
+    store = require_job_store()
+    job = store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/metrics/jobs")
+def job_metrics():
+    return require_job_store().counts()
+
+
+async def wait_for_job(building_id, agg):
+    """큐에 넣고 엔진 워커가 끝낼 때까지 대기 (기존 동기식 /simulate 응답 유지)
+
+    저장소 호출은 잠금 대기로 막힐 수 있어 스레드풀에서 실행 (이벤트 루프를 멈추지 않도록)
+    """
+    job_id = await run_in_threadpool(job_store.enqueue, building_id, agg.model_dump() if agg is not None else None)
+    deadline = time.time() + JOB_WAIT_TIMEOUT_SEC
+    while time.time() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL_SEC)
+        job = await run_in_threadpool(job_store.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=500, detail=f"Simulation job {job_id} disappeared from the job store")
+        if job["status"] == "done":
+            return job["result"]
+        if job["status"] == "failed":
+            raise HTTPException(status_code=job["error_code"] or 500, detail=job["error"])
+    raise HTTPException(status_code=504, detail=f"Simulation job {job_id} timed out (check GET /jobs/{job_id})")
+
+
 @app.post("/simulate/{building_id}")
-async def run_simulation(building_id: int, db: Session = Depends(get_db)):
-    global matlab_pkg
-    
-    if not matlab_pkg:
-        raise HTTPException(status_code=500, detail="MATLAB Engine is not active.")
+async def run_simulation(building_id: int, agg: Optional[AggregationRequest] = None, db: Session = Depends(get_db)):
+    if job_store is not None:
+        # API 전용 모드: 캐시 확인까지 엔진 워커가 처리
+        return await wait_for_job(building_id, agg)
 
-    # 1. DB 조회 (타겟 + 반경 700m 주변 건물)
     try:
-        # 타겟 확인
-        target_res = db.execute(text("SELECT geom FROM building_gis WHERE id = :bid"), {"bid": building_id}).fetchone()
-        if not target_res:
-            raise HTTPException(status_code=404, detail="Building ID not found in DB")
-        target_geom_raw = target_res[0]
-
-        # 주변 검색
-        query = text("""
-            SELECT id, geom, COALESCE(gro_flo_co, 1) as floors
-            FROM building_gis
-            WHERE ST_DWithin(
-                geom,
-                (SELECT geom FROM building_gis WHERE id = :bid),
-                700
-            )
-        """)
-        neighbors = db.execute(query, {"bid": building_id}).fetchall()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database Error: {str(e)}")
-
-    # 데이터 정리
-    building_list = []
-    for row in neighbors:
-        bid, bgeom, floors = row
-        h = float(floors) * 3.3
-        if h <= 0: h = 3.3
-        building_list.append({"geom": bgeom, "height": h, "is_target": (bid == building_id)})
-
-    # 2. 전처리 (NPY 생성)
-    req_uuid = str(uuid.uuid4())
-    temp_dir = os.path.abspath(os.path.join("temp", req_uuid)) # 절대 경로 사용
-    
-    try:
-        dsm_path, roof_mask, _ = create_simulation_inputs(target_geom_raw, building_list, temp_dir, "sim_input")
-    except Exception as e:
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        raise HTTPException(status_code=500, detail=f"Geometry Processing Error: {str(e)}")
-
-    # 3. MATLAB 시뮬레이션
-    weather_csv = os.path.abspath("RE100/38.csv") # 절대 경로 필수
-    if not os.path.exists(weather_csv):
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        raise HTTPException(status_code=500, detail="Weather data file missing (RE100/38.csv)")
-
-    output_csv = os.path.join(temp_dir, "result.csv")
-    result_data = []
-
-    async with engine_lock:
-        try:
-            print(f">>> [Sim] Start: ID {building_id}")
-            matlab_pkg.SNUsolar_dsm2irr(
-                weather_csv, 
-                matlab.double(37.6), 
-                matlab.double(127.2), 
-                matlab.double(129.0),
-                dsm_path, 
-                roof_mask, 
-                matlab.logical(False), 
-                matlab.double(0), 
-                matlab.double(180), 
-                output_csv
-            )
-            
-            if os.path.exists(output_csv):
-                df = pd.read_csv(output_csv)
-                # JSON 변환 (NaN 처리)
-                result_data = df.where(pd.notnull(df), None).to_dict(orient='records')
-            else:
-                raise Exception("Result CSV not created by MATLAB")
-
-        except Exception as e:
-            print(f">>> [Error] MATLAB Run Failed: {e}")
-            raise HTTPException(status_code=500, detail=f"Simulation Engine Error: {str(e)}")
-        finally:
-            # 4. 청소 (매우 중요: 임시 파일 삭제)
-            # 디버깅 중에는 아래 줄을 주석 처리 하세요.
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            print(f">>> [Sim] Finished: ID {building_id}")
-
-    return {
-        "building_id": building_id,
-        "buildings_in_radius": len(building_list),
-        "status": "success",
-        "results": result_data
-    }
+        # 1. DB 조회 (타겟 + 반경 700m 주변 건물)
+        target_geom_raw, building_list = load_buildings(db, building_id)
+
+        if not os.path.exists(WEATHER_CSV):
+            raise HTTPException(status_code=500, detail="Weather data file missing (RE100/38.csv)")
+
+        # 요약 요청이면 캐시 먼저 확인 (입력이 같으면 MATLAB 실행 생략)
+        fingerprint = input_fingerprint(building_list, WEATHER_CSV)
+        cached = cached_summary(result_cache, building_id, building_list, fingerprint, agg)
+        if cached is not None:
+            return cached
+
+        if not matlab_pkg:
+            raise HTTPException(status_code=500, detail="MATLAB Engine is not active.")
+
+        # 작업 폴더는 with 블록을 벗어날 때 항상 비워짐 (전처리 실패 포함)
+        with workspace_manager.acquire() as ws:
+            # 2. 전처리 (NPY 생성)
+            dsm_path, roof_mask = prepare_inputs(ws, target_geom_raw, building_list, matlab)
+
+            # 3. MATLAB 시뮬레이션 (4. 청소는 workspace_manager 가 담당)
+            async with engine_lock:
+                output_csv = run_engine(matlab_pkg, matlab, ws, building_id, dsm_path, roof_mask)
+            result_data, summary = collect_results(result_cache, output_csv, building_id, fingerprint, agg)
+
+    except SimulationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    return build_response(building_id, building_list, result_data, summary)
 
 if __name__ == "__main__":
     import uvicorn
-    # 워커는 반드시 1개여야 MATLAB 글로벌 변수 공유 가능
-    uvicorn.run(app, host="0.0.0.0", port=8000, workers=1)
\ No newline at end of file
+    if JOB_STORE_URL:
+        # API 전용 모드: MATLAB 은 engine_worker.py 에서 실행하므로 워커 여러 개 가능
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=int(os.environ.get("API_WORKERS", 4)))
+    else:
+        # 단일 프로세스 모드: 워커는 반드시 1개여야 MATLAB 글로벌 변수 공유 가능
+        uvicorn.run(app, host="0.0.0.0", port=8000, workers=1)
@@ -0,0 +1,111 @@
+import numpy as np
+
+# NumPy 배열 <-> matlab.double / matlab.logical 변환 계층
+# matlab.double(arr.tolist()) 방식은 1000x1000 DSM 기준 수 초가 걸리고
+# 파이썬 float 객체를 백만 개 만들기 때문에, 런타임이 지원하는 빠른 생성자를 우선 사용한다.
+#
+# 시도 순서
+#   1) buffer  : matlab.double(ndarray)            - 버퍼 프로토콜 직접 지원 (R2022b 이후)
+#   2) vector  : matlab.double(vector=..., size=..) - 열 우선(Fortran) 1차원 데이터 + 크기
+#   3) list    : matlab.double(ndarray.tolist())   - 가장 느리지만 모든 버전에서 동작
+#
+# 사용처: simulation.prepare_inputs (SIM_PASS_ARRAYS=1 이면 .npy 경로 대신 배열을 직접 전달)
+
+# (id(matlab 모듈), 타입 이름) -> (matlab 모듈, 방식). 모듈 참조를 같이 들고 있어 id 재사용 문제 없음
+_MODE_CACHE = {}
+
+
+def _get_matlab():
+    """SNUs_dsm2irrPkg 가 로딩한 matlab 모듈을 돌려준다."""
+    import SNUs_dsm2irrPkg
+    return SNUs_dsm2irrPkg._pir.ml_handle
+
+
+def _probe_mode(ml, name):
+    """작은 배열로 변환해 보고 동작하는 가장 빠른 방식을 고른다 (모듈/타입별 1회)."""
+    cache_key = (id(ml), name)
+    if cache_key in _MODE_CACHE:
+        return _MODE_CACHE[cache_key][1]
+
+    mtype = getattr(ml, name)
+    dtype = np.bool_ if name == "logical" else np.float64
+    sample = np.arange(6).reshape(2, 3).astype(dtype)
+
+    mode = "list"
+    for candidate in ("buffer", "vector"):
+        try:
+            converted = _construct(mtype, sample, candidate)
+            if tuple(converted.size) == sample.shape and np.array_equal(from_matlab(converted, dtype=dtype), sample):
+                mode = candidate
+                break
+        except Exception:
+            continue
+
+    _MODE_CACHE[cache_key] = (ml, mode)
+    return mode
+
+
+def conversion_mode(ml, name="double"):
+    """선택된 변환 방식 ("buffer" / "vector" / "list") - 진단/벤치마크용"""
+    return _probe_mode(ml, name)
+
+
+def _construct(mtype, arr, mode):
+    if mode == "buffer":
+        return mtype(arr)
+    if mode == "vector":
+        # MATLAB 는 열 우선 저장이므로 Fortran 순서로 펼친다
+        return mtype(vector=arr.ravel(order="F"), size=arr.shape)
+    return mtype(arr.tolist())
+
+
+def _to_matlab(arr, name, dtype, ml=None):
+    ml = ml if ml is not None else _get_matlab()
+    arr = np.asarray(arr, dtype=dtype)
+    # 스칼라/1차원은 MATLAB 관례대로 행 벡터(1xN)로 맞춤
+    if arr.ndim == 0:
+        arr = arr.reshape(1, 1)
+    elif arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+
+    mode = _probe_mode(ml, name)
+    try:
+        return _construct(getattr(ml, name), arr, mode)
+    except Exception:
+        if mode == "list":
+            raise
+        # 빠른 경로가 특정 입력(예: 비연속 배열)에서 실패하면 느린 경로로 재시도
+        return _construct(getattr(ml, name), arr, "list")
+
+
+def to_matlab_double(arr, ml=None):
+    """NumPy 배열(또는 시퀀스)을 matlab.double 로 변환"""
+    return _to_matlab(arr, "double", np.float64, ml)
+
+
+def to_matlab_logical(arr, ml=None):
+    """NumPy 배열(또는 시퀀스)을 matlab.logical 로 변환"""
+    return _to_matlab(arr, "logical", np.bool_, ml)
+
+
+def from_matlab(marr, dtype=np.float64):
+    """matlab.double / matlab.logical 을 NumPy 배열로 변환 (형상과 열 우선 순서 유지)"""
+    shape = tuple(marr.size)
+
+    # 1) 버퍼 프로토콜 - 복사 없이 뷰를 만든 뒤 형상 확인
+    try:
+        view = np.asarray(memoryview(marr))
+        if view.shape == shape:
+            return view.astype(dtype, copy=False)
+        if view.ndim == 1 and view.size == int(np.prod(shape)):
+            return view.reshape(shape, order="F").astype(dtype, copy=False)
+    except (TypeError, ValueError):
+        pass
+
+    # 2) 내부 열 우선 1차원 저장소 (순수 파이썬 구현의 matlab 배열)
+    data = getattr(marr, "_data", None)
+    if data is not None:
+        return np.asarray(data).reshape(shape, order="F").astype(dtype, copy=False)
+
+    # 3) 중첩 시퀀스 (가장 느림)
+    return np.asarray(marr, dtype=dtype).reshape(shape)
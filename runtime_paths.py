@@ -0,0 +1,129 @@
+import os
+import json
+import platform
+
+# MATLAB Runtime 위치 탐색
+# 우선순위: 환경변수 MATLAB_RUNTIME_ROOT > 이전 실행에서 찾은 경로(캐시)
+#          > PATH / LD_LIBRARY_PATH / DYLD_LIBRARY_PATH 에 이미 있는 runtime 폴더 > OS별 기본 설치 위치
+# 찾은 경로는 .runtime_paths.json 에 저장해 다음 시작 때 재탐색하지 않음 (이 캐시 하나만 사용)
+#   - 캐시에는 찾을 당시의 경로 환경변수 값도 저장해, 운영자가 환경변수를 바꾸면 무시하고 다시 찾음
+#   - setup_runtime_paths() 는 찾은 runtime 폴더를 경로 환경변수 맨 앞으로 옮기므로,
+#     SNUs_dsm2irrPkg 의 _PathInitializer 가 같은 환경변수를 훑을 때 항상 같은 Runtime 을 고름
+
+RUNTIME_RELEASE = "R2025a"
+RUNTIME_VERSION_W_DOTS = "25.1"
+RUNTIME_VERSION_W_UNDERSCORES = "25_1"
+
+CACHE_FILE = os.environ.get(
+    "MATLAB_RUNTIME_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".runtime_paths.json"))
+
+# OS별: (경로 환경변수, 아키텍처 폴더, 핵심 라이브러리 파일명, 기본 설치 위치)
+PLATFORM_INFO = {
+    "Windows": ("PATH", "win64", f"mclmcrrt{RUNTIME_VERSION_W_UNDERSCORES}.dll",
+                [rf"C:\Program Files\MATLAB\MATLAB Runtime\{RUNTIME_RELEASE}"]),
+    "Linux": ("LD_LIBRARY_PATH", "glnxa64", f"libmwmclmcrrt.so.{RUNTIME_VERSION_W_DOTS}",
+              [f"/usr/local/MATLAB/MATLAB_Runtime/{RUNTIME_RELEASE}",
+               f"/opt/mcr/{RUNTIME_RELEASE}",
+               f"/opt/matlabruntime/{RUNTIME_RELEASE}"]),
+    "Darwin": ("DYLD_LIBRARY_PATH", "maci64", f"libmwmclmcrrt.{RUNTIME_VERSION_W_DOTS}.dylib",
+               [f"/Applications/MATLAB/MATLAB_Runtime/{RUNTIME_RELEASE}"]),
+}
+
+
+def _platform():
+    system = platform.system()
+    if system not in PLATFORM_INFO:
+        raise RuntimeError(f"{system} is not a supported platform.")
+    path_var, arch, lib_name, defaults = PLATFORM_INFO[system]
+    if system == "Darwin" and platform.mac_ver()[-1] == "arm64":
+        arch = "maca64"
+    return system, path_var, arch, lib_name, defaults
+
+
+def runtime_dirs(root, arch):
+    """Runtime 루트 아래에서 OS 경로에 추가해야 하는 폴더들 (runtime 폴더가 첫 번째)"""
+    dirs = [os.path.join(root, "runtime", arch), os.path.join(root, "bin", arch)]
+    if arch == "glnxa64":
+        dirs += [os.path.join(root, "sys", "os", arch), os.path.join(root, "extern", "bin", arch)]
+    return dirs
+
+
+def _is_runtime_root(root, arch, lib_name):
+    return bool(root) and os.path.isfile(os.path.join(root, "runtime", arch, lib_name))
+
+
+def _read_cache(path_value):
+    """캐시된 루트. 저장 당시와 경로 환경변수 값이 다르면 None"""
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("path_value") != path_value:
+        return None
+    return data.get("root")
+
+
+def _write_cache(root, path_value):
+    try:
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"root": root, "path_value": path_value}, f)
+    except OSError:
+        # 읽기 전용 배포 환경이면 캐시 없이 진행
+        pass
+
+
+def find_runtime_root():
+    """MATLAB Runtime 루트 폴더를 찾는다. 못 찾으면 None"""
+    _, path_var, arch, lib_name, defaults = _platform()
+
+    env_root = os.environ.get("MATLAB_RUNTIME_ROOT")
+    if env_root:
+        if not _is_runtime_root(env_root, arch, lib_name):
+            raise RuntimeError(f"MATLAB_RUNTIME_ROOT does not contain runtime/{arch}/{lib_name}: {env_root}")
+        return env_root
+
+    path_value = os.environ.get(path_var, "")
+    cached = _read_cache(path_value)
+    if _is_runtime_root(cached, arch, lib_name):
+        return cached
+
+    # <root>/runtime/<arch> 가 경로 환경변수에 있으면 그 루트 사용
+    from_env_path = [os.path.dirname(os.path.dirname(os.path.normpath(p)))
+                     for p in path_value.split(os.pathsep) if p]
+    for root in from_env_path + defaults:
+        if _is_runtime_root(root, arch, lib_name):
+            _write_cache(root, path_value)
+            return root
+    return None
+
+
+def setup_runtime_paths():
+    """Runtime 폴더를 OS 경로 환경변수(PATH / LD_LIBRARY_PATH / DYLD_LIBRARY_PATH) 맨 앞에 둔다.
+
+    이미 환경변수 뒤쪽에 있으면 앞으로 옮김 (다른 Runtime 이 먼저 잡히지 않도록).
+    Linux/Mac 의 동적 로더는 프로세스 시작 시 환경변수를 읽으므로, 운영 환경에서는
+    실행 전에 설정해 두는 것이 가장 확실하다. 여기서는 패키지의 경로 탐색용으로 추가함.
+    """
+    system, path_var, arch, _, _ = _platform()
+    root = find_runtime_root()
+    if root is None:
+        print(f">>> [Warning] MATLAB Runtime not found. Set MATLAB_RUNTIME_ROOT or {path_var}.")
+        return None
+
+    dirs = [d for d in runtime_dirs(root, arch) if os.path.isdir(d)]
+    dirs_norm = {os.path.normpath(d) for d in dirs}
+    rest = [p for p in os.environ.get(path_var, "").split(os.pathsep)
+            if p and os.path.normpath(p) not in dirs_norm]
+    os.environ[path_var] = os.pathsep.join(dirs + rest)
+
+    # Python 3.8+ Windows 는 DLL 검색 경로를 별도로 허용해야 함
+    if system == "Windows" and hasattr(os, "add_dll_directory"):
+        for d in dirs:
+            if os.path.isdir(d):
+                try:
+                    os.add_dll_directory(d)
+                except OSError as e:
+                    print(f">>> [Warning] DLL path add failed: {e}")
+    return root
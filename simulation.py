@@ -0,0 +1,237 @@
+import os
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import text
+
+import aggregation
+from matlab_arrays import to_matlab_double, to_matlab_logical
+from utils import create_simulation_inputs, render_simulation_inputs
+from workspace import WorkspaceQuotaError
+
+# 시뮬레이션 파이프라인 (DB 조회 -> 전처리 -> MATLAB -> 결과 정리)
+# API 서버(main.py, 단일 프로세스 모드)와 엔진 워커(engine_worker.py)가 함께 사용
+
+WEATHER_CSV = os.path.abspath("RE100/38.csv") # 절대 경로 필수
+
+# 1 이면 DSM/지붕 마스크를 .npy 파일 대신 matlab.double / matlab.logical 배열로 직접 전달
+# (SNUsolar_dsm2irr 가 배열 입력을 받도록 빌드된 경우에만 사용)
+PASS_ARRAYS = os.environ.get("SIM_PASS_ARRAYS") == "1"
+
+
+class SimulationError(Exception):
+    """HTTP 상태 코드와 메시지를 함께 전달 (API 에서는 HTTPException 으로 변환)"""
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class AggregationRequest(BaseModel):
+    # 비워두면 전체 항목 (annual, monthly, seasonal, tou, peak, capacity_factor, re100)
+    rollups: Optional[List[str]] = None
+    capacity_kw: Optional[float] = None
+    # RE100 달성률 계산용 시간별 부하 (8760개, kWh)
+    load_profile: Optional[List[float]] = None
+    # result.csv 의 발전량 열 이름 (없으면 마지막 열)
+    value_column: Optional[str] = None
+    use_cache: bool = True
+
+
+def build_aggregates(result_csv, weather_csv, agg: AggregationRequest):
+    """ValueError 는 요청 값 문제(열 이름, 부하 길이, 항목 이름)일 때만 발생"""
+    try:
+        time_index = aggregation.load_time_index(weather_csv)
+    except ValueError as e:
+        # 서버 쪽 기상 파일 문제는 클라이언트 오류(400)로 보이지 않게 변환
+        raise RuntimeError(f"Weather data error: {str(e)}")
+    generation = aggregation.load_hourly_result(result_csv, agg.value_column)
+    return aggregation.compute_aggregates(
+        generation, time_index,
+        rollups=agg.rollups, capacity_kw=agg.capacity_kw, load_profile=agg.load_profile,
+    )
+
+
+def cached_summary(cache, building_id, building_list, fingerprint, agg: AggregationRequest, weather_csv=WEATHER_CSV):
+    """요약 요청이면 캐시 확인 (있으면 MATLAB 실행 생략). 없으면 None
+
+    fingerprint 는 aggregation.input_fingerprint() 값 - 건물/기상 입력이 바뀌면 캐시를 쓰지 않음
+    """
+    if agg is None or not agg.use_cache:
+        return None
+    cache_key = aggregation.aggregate_cache_key(agg.rollups, agg.capacity_kw, agg.load_profile, agg.value_column)
+    summary = cache.get_aggregates(building_id, fingerprint, cache_key)
+    if summary is None:
+        cached_csv = cache.get_result(building_id, fingerprint)
+        if cached_csv is None:
+            return None
+        try:
+            summary = build_aggregates(cached_csv, weather_csv, agg)
+        except ValueError as e:
+            raise SimulationError(400, f"Aggregation Error: {str(e)}")
+        except Exception as e:
+            raise SimulationError(500, f"Result Processing Error: {str(e)}")
+        cache.put_aggregates(building_id, fingerprint, cache_key, summary)
+    return build_response(building_id, building_list, [], summary, cached=True)
+
+
+def load_buildings(db, building_id):
+    """DB 조회 (타겟 + 반경 700m 주변 건물) -> (타겟 geom, 건물 목록)"""
+    try:
+        # 타겟 확인
+        target_res = db.execute(text("SELECT geom FROM building_gis WHERE id = :bid"), {"bid": building_id}).fetchone()
+        if not target_res:
+            raise SimulationError(404, "Building ID not found in DB")
+        target_geom_raw = target_res[0]
+
+        # 주변 검색
+        query = text("""
+            SELECT id, geom, COALESCE(gro_flo_co, 1) as floors
+            FROM building_gis
+            WHERE ST_DWithin(
+                geom,
+                (SELECT geom FROM building_gis WHERE id = :bid),
+                700
+            )
+        """)
+        neighbors = db.execute(query, {"bid": building_id}).fetchall()
+    except SimulationError:
+        raise
+    except Exception as e:
+        raise SimulationError(500, f"Database Error: {str(e)}")
+
+    # 데이터 정리
+    building_list = []
+    for row in neighbors:
+        bid, bgeom, floors = row
+        h = float(floors) * 3.3
+        if h <= 0: h = 3.3
+        building_list.append({"geom": bgeom, "height": h, "is_target": (bid == building_id)})
+
+    return target_geom_raw, building_list
+
+
+def prepare_inputs(ws, target_geom_raw, building_list, matlab=None):
+    """전처리 -> (dsm, 지붕 마스크). 기본은 NPY 파일 경로, PASS_ARRAYS 이면 MATLAB 배열"""
+    try:
+        if PASS_ARRAYS and matlab is not None:
+            dsm, mask_roof = render_simulation_inputs(target_geom_raw, building_list)
+            return to_matlab_double(dsm, matlab), to_matlab_logical(mask_roof, matlab)
+
+        dsm_path, roof_mask, _ = create_simulation_inputs(target_geom_raw, building_list, ws.path, "sim_input")
+        ws.check_quota()
+    except WorkspaceQuotaError as e:
+        raise SimulationError(507, f"Workspace Error: {str(e)}")
+    except Exception as e:
+        raise SimulationError(500, f"Geometry Processing Error: {str(e)}")
+    return dsm_path, roof_mask
+
+
+def run_engine(matlab_pkg, matlab, ws, building_id, dsm_path, roof_mask, weather_csv=WEATHER_CSV):
+    """MATLAB 시뮬레이션 실행 -> 결과 CSV 경로
+
+    MATLAB 런타임은 프로세스당 한 번에 한 요청만 처리하므로 호출하는 쪽에서 직렬화해야 함.
+    """
+    output_csv = os.path.join(ws.path, "result.csv")
+
+    try:
+        # tmpfs 루트에서 RAM 고갈 방지 - 여유 공간이 quota 보다 적으면 실행하지 않음
+        ws.ensure_free_space()
+        print(f">>> [Sim] Start: ID {building_id}")
+        matlab_pkg.SNUsolar_dsm2irr(
+            weather_csv,
+            matlab.double(37.6),
+            matlab.double(127.2),
+            matlab.double(129.0),
+            dsm_path,
+            roof_mask,
+            matlab.logical(False),
+            matlab.double(0),
+            matlab.double(180),
+            output_csv
+        )
+
+        if not os.path.exists(output_csv):
+            raise Exception("Result CSV not created by MATLAB")
+        ws.check_quota()
+
+    except WorkspaceQuotaError as e:
+        raise SimulationError(507, f"Workspace Error: {str(e)}")
+    except Exception as e:
+        print(f">>> [Error] MATLAB Run Failed: {e}")
+        raise SimulationError(500, f"Simulation Engine Error: {str(e)}")
+    finally:
+        # 청소는 workspace_manager 가 담당 (디버깅 시 SIM_WORKSPACE_ROOT 를 지정해 확인)
+        print(f">>> [Sim] Finished: ID {building_id}")
+
+    return output_csv
+
+
+def collect_results(cache, output_csv, building_id, fingerprint, agg=None, weather_csv=WEATHER_CSV):
+    """MATLAB 결과 정리 -> (시간별 결과 목록, 요약). 요약 요청이면 원본 결과와 함께 캐시에 저장"""
+    if agg is None:
+        try:
+            import pandas as pd
+            df = pd.read_csv(output_csv)
+            # JSON 변환 (NaN 처리)
+            return df.where(pd.notnull(df), None).to_dict(orient='records'), None
+        except Exception as e:
+            raise SimulationError(500, f"Result Processing Error: {str(e)}")
+
+    try:
+        cache.put_result(building_id, fingerprint, output_csv)
+    except Exception as e:
+        raise SimulationError(500, f"Result Processing Error: {str(e)}")
+
+    # 요청 값(열 이름, 부하 길이, 항목 이름)이 잘못된 경우만 400
+    try:
+        summary = build_aggregates(output_csv, weather_csv, agg)
+    except ValueError as e:
+        raise SimulationError(400, f"Aggregation Error: {str(e)}")
+    except Exception as e:
+        raise SimulationError(500, f"Result Processing Error: {str(e)}")
+
+    cache_key = aggregation.aggregate_cache_key(agg.rollups, agg.capacity_kw, agg.load_profile, agg.value_column)
+    cache.put_aggregates(building_id, fingerprint, cache_key, summary)
+    return [], summary
+
+
+def build_response(building_id, building_list, result_data, summary, cached=False):
+    if summary is not None:
+        return {
+            "building_id": building_id,
+            "buildings_in_radius": len(building_list),
+            "status": "success",
+            "cached": cached,
+            "aggregates": summary
+        }
+
+    return {
+        "building_id": building_id,
+        "buildings_in_radius": len(building_list),
+        "status": "success",
+        "results": result_data
+    }
+
+
+def simulate_building(matlab_pkg, matlab, db, workspace_manager, cache, building_id, agg=None):
+    """전체 파이프라인을 한 번에 실행 (엔진 워커용). 실패 시 SimulationError"""
+    target_geom_raw, building_list = load_buildings(db, building_id)
+    if not os.path.exists(WEATHER_CSV):
+        raise SimulationError(500, "Weather data file missing (RE100/38.csv)")
+    fingerprint = aggregation.input_fingerprint(building_list, WEATHER_CSV)
+
+    cached = cached_summary(cache, building_id, building_list, fingerprint, agg)
+    if cached is not None:
+        return cached
+
+    if not matlab_pkg:
+        raise SimulationError(500, "MATLAB Engine is not active.")
+
+    # 작업 폴더는 with 블록을 벗어날 때 항상 비워짐 (전처리 실패 포함)
+    with workspace_manager.acquire() as ws:
+        dsm_path, roof_mask = prepare_inputs(ws, target_geom_raw, building_list, matlab)
+        output_csv = run_engine(matlab_pkg, matlab, ws, building_id, dsm_path, roof_mask)
+        result_data, summary = collect_results(cache, output_csv, building_id, fingerprint, agg)
+
+    return build_response(building_id, building_list, result_data, summary)
@@ -0,0 +1,62 @@
+import sys
+import types
+
+# database 모듈 대역 - PostgreSQL 없이 main / engine_worker 를 import 하고 파이프라인을 돌리기 위함
+# simulation.load_buildings 가 보내는 두 쿼리(타겟 geom, 반경 내 건물)만 흉내낸다.
+# buildings: [(id, geom, 층수), ...] - 반경 검색은 하지 않고 전체를 돌려줌
+
+
+class FakeResult(object):
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class FakeSession(object):
+    def __init__(self, buildings):
+        self.buildings = list(buildings)
+        self.closed = False
+
+    def execute(self, statement, params=None):
+        bid = (params or {}).get("bid")
+        if "ST_DWithin" in str(statement):
+            if not any(b[0] == bid for b in self.buildings):
+                return FakeResult([])
+            return FakeResult(self.buildings)
+        return FakeResult([(b[1],) for b in self.buildings if b[0] == bid])
+
+    def close(self):
+        self.closed = True
+
+
+def make_database(buildings=()):
+    module = types.ModuleType("database")
+    module.sessions = []
+
+    def session_local():
+        db = FakeSession(buildings)
+        module.sessions.append(db)
+        return db
+
+    def get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    module.SessionLocal = session_local
+    module.get_db = get_db
+    return module
+
+
+def install(buildings=()):
+    """sys.modules["database"] 를 대역으로 교체 (main / engine_worker import 전에 호출)"""
+    module = make_database(buildings)
+    sys.modules["database"] = module
+    return module
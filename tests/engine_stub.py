@@ -0,0 +1,45 @@
+import threading
+import time
+import types
+
+# SNUs_dsm2irrPkg(initialize() 결과) / matlab 모듈 대역 - MATLAB 없이 simulation 파이프라인을 돌리기 위함
+# SNUsolar_dsm2irr 는 입력 파일 확인 후 8760행 result.csv 를 씀 (delay 초 만큼 걸리는 척)
+
+HOURS = 8760
+TARGET_ID = 7
+
+# matlab.double / matlab.logical 은 값을 그대로 통과 (run_engine 의 스칼라 인자용)
+MATLAB = types.SimpleNamespace(double=lambda value: value, logical=lambda value: value)
+
+
+class StubEngine(object):
+    def __init__(self, delay=0.0, kwh=1.0, error=None):
+        self.delay = delay
+        self.kwh = kwh
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def SNUsolar_dsm2irr(self, weather_csv, lat, lon, alt, dsm_path, roof_mask, facade, tilt, azimuth, output_csv):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        with open(dsm_path, "rb"), open(roof_mask, "rb"), open(weather_csv, "rb"):
+            pass
+        with open(output_csv, "w") as f:
+            f.write("hour,kwh\n")
+            f.writelines(f"{h},{self.kwh}\n" for h in range(HOURS))
+
+    def terminate(self):
+        pass
+
+
+def buildings():
+    """db_stub 용 (id, WKB hex, 층수) - 타겟 + 주변 건물 1개 (EPSG:5179 좌표)"""
+    from shapely.geometry import box
+    return [
+        (TARGET_ID, box(955000, 1950000, 955020, 1950020).wkb_hex, 3),
+        (TARGET_ID + 1, box(955040, 1950000, 955060, 1950030).wkb_hex, 5),
+    ]
@@ -0,0 +1,62 @@
+import array
+import types
+
+import numpy as np
+
+# matlab 모듈(matlab.double / matlab.logical) 대역 - MATLAB Runtime 없이 matlab_arrays 시험용
+# 생성자 방식별로 하나씩:
+#   "buffer": 버퍼 프로토콜 객체만 받음, 자신도 버퍼를 내보냄 (R2022b 이후 동작)
+#   "vector": vector=/size= 키워드만 받음, 내부 열 우선 _data 보관
+#   "list"  : 중첩 리스트만 받음, 행 단위 시퀀스로만 읽을 수 있음
+
+
+def _buffer_type(typecode, dtype):
+    class BufferArray(array.array):
+        def __new__(cls, initializer=None, size=None, is_complex=False):
+            arr = np.asarray(memoryview(initializer))  # 리스트는 TypeError
+            if arr.ndim != 2:
+                raise ValueError("expected a 2-D buffer")
+            obj = super().__new__(cls, typecode, arr.astype(dtype).ravel(order="F").tobytes())
+            obj.size = arr.shape
+            return obj
+    return BufferArray
+
+
+def _vector_type(typecode, dtype):
+    class VectorArray(object):
+        def __init__(self, initializer=None, size=None, vector=None):
+            if vector is None or initializer is not None:
+                raise TypeError("only vector=/size= supported")
+            data = np.asarray(vector, dtype=dtype)
+            if data.size != int(np.prod(size)):
+                raise ValueError("vector length does not match size")
+            self._data = array.array(typecode, data.tobytes())
+            self.size = tuple(size)
+    return VectorArray
+
+
+def _list_type(dtype):
+    class ListArray(object):
+        def __init__(self, initializer=None, size=None):
+            if not isinstance(initializer, list):
+                raise TypeError("only nested lists supported")
+            self._rows = [[dtype(v) for v in row] for row in initializer]
+            self.size = (len(self._rows), len(self._rows[0]) if self._rows else 0)
+
+        def __len__(self):
+            return len(self._rows)
+
+        def __getitem__(self, i):
+            return self._rows[i]
+    return ListArray
+
+
+def make_matlab(mode):
+    """mode("buffer" / "vector" / "list") 생성자만 지원하는 matlab 모듈 대역"""
+    if mode == "buffer":
+        return types.SimpleNamespace(double=_buffer_type("d", np.float64), logical=_buffer_type("B", np.uint8))
+    if mode == "vector":
+        return types.SimpleNamespace(double=_vector_type("d", np.float64), logical=_vector_type("B", np.uint8))
+    if mode == "list":
+        return types.SimpleNamespace(double=_list_type(float), logical=_list_type(bool))
+    raise ValueError(mode)
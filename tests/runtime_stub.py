@@ -0,0 +1,59 @@
+import os
+
+# 가짜 MATLAB Runtime 폴더 구조 (Linux, glnxa64)
+# SNUs_dsm2irrPkg 의 _PathInitializer 가 찾는 파일/모듈만 최소로 만든다.
+
+ARCH = "glnxa64"
+LIB_NAME = "libmwmclmcrrt.so.25.1"
+
+_CPPEXT = """\
+def initializeApplication(option_list):
+    pass
+
+def terminateApplication():
+    pass
+"""
+
+_PYSDK_RUNTIME = """\
+_runtime_version_w_dots = None
+_cppext_handle = None
+
+
+class DeployablePackage(object):
+    def __init__(self, path_initializer, package_name, package_file):
+        self.package_name = package_name
+
+    def initialize(self):
+        pass
+
+    def terminate(self):
+        pass
+"""
+
+_MATLAB = """\
+class double(object):
+    def __init__(self, initializer=None, size=None, is_complex=False):
+        self.initializer = initializer
+
+
+class logical(double):
+    pass
+"""
+
+
+def _write(path, text=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def make_runtime(root):
+    """root 아래에 R2025a 형태의 가짜 Runtime 을 만들고 root 를 돌려준다"""
+    pysdk = os.path.join(root, "toolbox", "compiler_sdk", "pysdk_py")
+    _write(os.path.join(root, "runtime", ARCH, LIB_NAME))
+    os.makedirs(os.path.join(root, "bin", ARCH), exist_ok=True)
+    _write(os.path.join(root, "extern", "bin", ARCH, "matlabruntimeforpython_abi3.py"), _CPPEXT)
+    _write(os.path.join(pysdk, "matlab_pysdk", "__init__.py"))
+    _write(os.path.join(pysdk, "matlab_pysdk", "runtime", "__init__.py"), _PYSDK_RUNTIME)
+    _write(os.path.join(pysdk, "matlab_mod_dist", "matlab", "__init__.py"), _MATLAB)
+    return root
@@ -0,0 +1,188 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+import aggregation
+
+WEATHER_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RE100", "38.csv")
+
+
+def _synthetic_index(days_per_month=2):
+    """매월 days_per_month 일 x 24시간 인덱스"""
+    month = np.repeat(np.arange(1, 13), 24 * days_per_month)
+    hour = np.tile(np.arange(24), 12 * days_per_month)
+    return aggregation.build_time_index(month, hour)
+
+
+def test_tou_hours_match_kepco_intervals():
+    # 여름·봄가을 최대부하 11~12시, 13~18시 / 겨울 09~12시, 16~19시 (h = h:00~h+1:00)
+    assert aggregation.TOU_PEAK_HOURS["summer"] == [11, 13, 14, 15, 16, 17]
+    assert aggregation.TOU_PEAK_HOURS["spring_fall"] == [11, 13, 14, 15, 16, 17]
+    assert aggregation.TOU_PEAK_HOURS["winter"] == [9, 10, 11, 16, 17, 18]
+    assert aggregation.TOU_OFF_PEAK_HOURS == [0, 1, 2, 3, 4, 5, 6, 7, 22, 23]
+
+
+def test_tou_bucket_hours_per_day():
+    ti = _synthetic_index(days_per_month=1)
+    for month, season in ((7, "summer"), (4, "spring_fall"), (1, "winter")):
+        tou = ti["tou"][ti["month"] == month]
+        # 경부하 10시간, 최대부하 6시간, 중간부하 8시간
+        assert np.bincount(tou, minlength=3).tolist() == [10, 8, 6], season
+    jan = ti["tou"][ti["month"] == 1]
+    assert jan[9] == 2 and jan[12] == 1 and jan[18] == 2 and jan[19] == 1
+    jul = ti["tou"][ti["month"] == 7]
+    assert jul[10] == 1 and jul[11] == 2 and jul[12] == 1 and jul[17] == 2 and jul[18] == 1
+
+
+def test_weather_hour_is_interval_start():
+    # 수평면 일사량 평균이 12시·13시 부근에서 대칭 -> 시간 값은 구간 시작 시각
+    cols = np.loadtxt(WEATHER_CSV, delimiter=",", skiprows=1, usecols=(4, 15), encoding="cp949")
+    by_hour = np.bincount(cols[:, 0].astype(int), weights=cols[:, 1])
+    assert int(np.argmax(by_hour)) in (12, 13)
+    assert by_hour[0] == 0 and by_hour[23] == 0
+
+
+def test_bucket_totals():
+    ti = _synthetic_index()
+    gen = np.arange(len(ti["month"]), dtype=np.float64)
+    out = aggregation.compute_aggregates(gen, ti, rollups=["annual", "monthly", "seasonal", "tou"])
+
+    total = gen.sum()
+    assert out["annual_kwh"] == pytest.approx(total)
+    assert sum(out["monthly_kwh"].values()) == pytest.approx(total)
+    assert sum(out["seasonal_kwh"].values()) == pytest.approx(total)
+    assert sum(out["tou_kwh"].values()) == pytest.approx(total)
+    assert out["monthly_kwh"]["1"] == pytest.approx(gen[:48].sum())
+    summer = gen[np.isin(ti["month"], [6, 7, 8])].sum()
+    assert out["seasonal_kwh"]["summer"] == pytest.approx(summer)
+
+
+def test_real_weather_index_daylight_profile():
+    ti = aggregation.load_time_index(WEATHER_CSV)
+    assert len(ti["month"]) == 8760
+    gen = ((ti["hour"] >= 7) & (ti["hour"] <= 18)).astype(np.float64)
+    out = aggregation.compute_aggregates(gen, ti, rollups=["annual", "tou"])
+    assert out["annual_kwh"] == 12 * 365
+    assert out["tou_kwh"] == {"off_peak": 365.0, "mid_peak": 1825.0, "on_peak": 2190.0}
+
+
+def test_length_mismatch():
+    ti = _synthetic_index()
+    with pytest.raises(ValueError):
+        aggregation.compute_aggregates(np.zeros(10), ti)
+
+
+def test_unknown_rollup():
+    ti = _synthetic_index()
+    with pytest.raises(ValueError):
+        aggregation.compute_aggregates(np.zeros(len(ti["month"])), ti, rollups=["weekly"])
+
+
+@pytest.mark.parametrize("capacity_kw", [None, 0, -1])
+def test_capacity_factor_without_capacity(capacity_kw):
+    ti = _synthetic_index()
+    gen = np.ones(len(ti["month"]))
+    out = aggregation.compute_aggregates(gen, ti, rollups=["capacity_factor"], capacity_kw=capacity_kw)
+    assert out["capacity_factor"] is None
+
+
+def test_capacity_factor():
+    ti = _synthetic_index()
+    gen = np.full(len(ti["month"]), 0.5)
+    out = aggregation.compute_aggregates(gen, ti, rollups=["capacity_factor"], capacity_kw=2)
+    assert out["capacity_factor"] == pytest.approx(0.25)
+
+
+def test_all_zero_generation():
+    ti = _synthetic_index()
+    n = len(ti["month"])
+    out = aggregation.compute_aggregates(np.zeros(n), ti, capacity_kw=10, load_profile=np.ones(n))
+    assert out["annual_kwh"] == 0
+    assert out["capacity_factor"] == 0
+    assert out["peak"]["kwh"] == 0
+    assert out["re100"]["annual_coverage"] == 0
+    assert out["re100"]["self_consumption_ratio"] is None
+    assert out["re100"]["surplus_kwh"] == 0
+
+
+def test_re100_coverage():
+    ti = _synthetic_index()
+    n = len(ti["month"])
+    gen = np.where(np.arange(n) % 2 == 0, 2.0, 0.0)
+    load = np.ones(n)
+    re100 = aggregation.compute_aggregates(gen, ti, rollups=["re100"], load_profile=load)["re100"]
+    assert re100["annual_coverage"] == pytest.approx(1.0)
+    assert re100["hourly_matched_coverage"] == pytest.approx(0.5)
+    assert re100["self_consumption_ratio"] == pytest.approx(0.5)
+    assert re100["surplus_kwh"] == pytest.approx(n / 2)
+    with pytest.raises(ValueError):
+        aggregation.compute_aggregates(gen, ti, rollups=["re100"], load_profile=load[:-1])
+
+
+def test_load_hourly_result_column_selection():
+    csv = "hour,irr,kwh\n0,1,2.5\n1,,1.0\n"
+    assert aggregation.load_hourly_result(io.StringIO(csv)).tolist() == [2.5, 1.0]
+    assert aggregation.load_hourly_result(io.StringIO(csv), "irr").tolist() == [1.0, 0.0]
+    with pytest.raises(ValueError):
+        aggregation.load_hourly_result(io.StringIO(csv), "missing")
+
+
+def test_input_fingerprint_tracks_buildings_and_weather(tmp_path):
+    weather = tmp_path / "w.csv"
+    weather.write_text("header\n")
+    buildings = [{"geom": "0103AA", "height": 3.3, "is_target": True},
+                 {"geom": b"\x01\x02", "height": 6.6, "is_target": False}]
+    fp = aggregation.input_fingerprint(buildings, str(weather))
+
+    assert aggregation.input_fingerprint(list(reversed(buildings)), str(weather)) == fp
+    taller = [dict(buildings[0]), dict(buildings[1], height=9.9)]
+    assert aggregation.input_fingerprint(taller, str(weather)) != fp
+    os.utime(weather, ns=(0, 0))
+    assert aggregation.input_fingerprint(buildings, str(weather)) != fp
+
+
+def test_local_result_cache(tmp_path):
+    cache = aggregation.LocalResultCache(str(tmp_path / "cache"))
+    assert cache.get_result(1, "fp") is None
+    assert cache.get_aggregates(1, "fp", "k") is None
+
+    src = tmp_path / "result.csv"
+    src.write_text("kwh\n1\n")
+    cache.put_result(1, "fp", str(src))
+    cache.put_aggregates(1, "fp", "k", {"annual_kwh": 1.0})
+    assert open(cache.get_result(1, "fp")).read() == "kwh\n1\n"
+    assert cache.get_aggregates(1, "fp", "k") == {"annual_kwh": 1.0}
+    # 입력이 바뀌면(fingerprint 다름) 캐시 미스
+    assert cache.get_result(1, "other") is None
+
+
+def test_local_result_cache_prunes_old_fingerprints(tmp_path):
+    cache = aggregation.LocalResultCache(str(tmp_path / "cache"))
+    src = tmp_path / "result.csv"
+    src.write_text("kwh\n1\n")
+    cache.put_result(1, "old", str(src))
+    cache.put_aggregates(1, "old", "k", {"annual_kwh": 1.0})
+    cache.put_result(2, "other", str(src))
+
+    cache.put_result(1, "new", str(src))
+    assert cache.get_result(1, "old") is None
+    assert cache.get_aggregates(1, "old", "k") is None
+    assert cache.get_result(1, "new") is not None
+    # 다른 건물 캐시는 그대로
+    assert cache.get_result(2, "other") is not None
+
+
+def test_time_index_is_memoized_until_file_changes(tmp_path):
+    weather = tmp_path / "w.csv"
+    weather.write_text("h\n1,2016,1,1,0\n2,2016,7,1,11\n", encoding="cp949")
+    first = aggregation.load_time_index(str(weather))
+    assert aggregation.load_time_index(str(weather)) is first
+    assert first["tou"].tolist() == [0, 2]
+    with pytest.raises(ValueError):
+        first["tou"][0] = 1
+
+    weather.write_text("h\n1,2016,1,1,9\n", encoding="cp949")
+    os.utime(weather, ns=(0, 0))
+    assert aggregation.load_time_index(str(weather))["tou"].tolist() == [2]
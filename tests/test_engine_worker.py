@@ -0,0 +1,148 @@
+import sqlite3
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("shapely")
+
+import db_stub
+db_stub.install()
+
+import engine_worker
+from engine_stub import MATLAB, TARGET_ID, StubEngine, buildings
+from job_queue import SQLiteJobStore
+from workspace import WorkspaceManager
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    database = db_stub.make_database(buildings())
+    monkeypatch.setattr(engine_worker, "SessionLocal", database.SessionLocal)
+    workspace_manager = WorkspaceManager(root=str(tmp_path / "ws"), quota_bytes=0, slots=1)
+    return database, workspace_manager, tmp_path
+
+
+def _run(store, engine, workspace_manager, building_id, payload=None, worker="w"):
+    job_id = store.enqueue(building_id, payload)
+    job = store.claim(worker)
+    recorded = engine_worker.process_job(store, job, worker, engine, MATLAB, workspace_manager)
+    return recorded, store.get(job_id)
+
+
+def test_success_and_shared_cache(env):
+    database, workspace_manager, tmp_path = env
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    engine = StubEngine(kwh=0.5)
+
+    recorded, job = _run(store, engine, workspace_manager, TARGET_ID)
+    assert recorded and job["status"] == "done"
+    assert job["result"]["buildings_in_radius"] == 2
+    assert len(job["result"]["results"]) == 8760
+
+    payload = {"rollups": ["annual"]}
+    _, first = _run(store, engine, workspace_manager, TARGET_ID, payload)
+    # 다른 워커(새 저장소 객체)도 같은 캐시를 봄 -> MATLAB 다시 실행하지 않음
+    _, second = _run(SQLiteJobStore(store.path), engine, workspace_manager, TARGET_ID, payload, worker="other")
+    assert first["result"]["aggregates"] == {"annual_kwh": 4380.0}
+    assert (first["result"]["cached"], second["result"]["cached"]) == (False, True)
+    assert second["result"].keys() == first["result"].keys()
+    assert engine.calls == 2
+    assert all(db.closed for db in database.sessions)
+
+
+@pytest.mark.parametrize("building_id, payload, engine, code, message", [
+    (999, None, StubEngine(), 404, "Building ID not found"),
+    (TARGET_ID, None, StubEngine(error=RuntimeError("license")), 500, "Simulation Engine Error: license"),
+    (TARGET_ID, {"rollups": ["weekly"]}, StubEngine(), 400, "Aggregation Error"),
+    (TARGET_ID, {"rollups": 5}, StubEngine(), 500, "Simulation Engine Error"),
+])
+def test_errors_are_recorded(env, building_id, payload, engine, code, message):
+    _, workspace_manager, tmp_path = env
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    recorded, job = _run(store, engine, workspace_manager, building_id, payload)
+    assert recorded
+    assert job["status"] == "failed"
+    assert job["error_code"] == code
+    assert message in job["error"]
+
+
+def test_lost_lease_result_is_discarded(env):
+    _, workspace_manager, tmp_path = env
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), lease_sec=0.1)
+    job_id = store.enqueue(TARGET_ID)
+    job = store.claim("a")
+    time.sleep(0.15)
+    assert store.requeue_stale() == (1, 0)
+    store.claim("b")
+
+    assert engine_worker.process_job(store, job, "a", StubEngine(), MATLAB, workspace_manager) is False
+    assert store.get(job_id)["status"] == "running"
+    assert store.get(job_id)["worker"] == "b"
+
+
+def test_long_job_keeps_lease_and_completes_once(env):
+    _, workspace_manager, tmp_path = env
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), lease_sec=0.3)
+    engine = StubEngine(delay=1.2)
+    job_id = store.enqueue(TARGET_ID)
+    job = store.claim("a")
+
+    # 다른 워커가 실행 내내 lease 만료 확인 + 작업 가져가기를 시도
+    stolen = []
+    finished = threading.Event()
+
+    def other_worker():
+        other = SQLiteJobStore(store.path, lease_sec=0.3)
+        while not finished.is_set():
+            other.requeue_stale()
+            claimed = other.claim("b")
+            if claimed is not None:
+                stolen.append(claimed)
+            time.sleep(0.05)
+
+    thread = threading.Thread(target=other_worker)
+    thread.start()
+    try:
+        recorded = engine_worker.process_job(store, job, "a", engine, MATLAB, workspace_manager)
+    finally:
+        finished.set()
+        thread.join()
+
+    result = store.get(job_id)
+    assert recorded is True
+    assert stolen == []
+    assert (result["status"], result["worker"], result["attempts"]) == ("done", "a", 1)
+    assert engine.calls == 1
+
+
+def test_worker_loop_survives_store_errors(env, monkeypatch):
+    _, workspace_manager, tmp_path = env
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    store.enqueue(TARGET_ID)
+
+    calls = {"claim": 0}
+    real_claim = store.claim
+
+    def flaky_claim(worker=None):
+        calls["claim"] += 1
+        if calls["claim"] <= 2:
+            raise sqlite3.OperationalError("database is locked")
+        return real_claim(worker)
+
+    monkeypatch.setattr(store, "claim", flaky_claim)
+    monkeypatch.setattr(engine_worker, "open_store", lambda url: store)
+    monkeypatch.setattr(engine_worker, "WorkspaceManager", lambda: workspace_manager)
+    monkeypatch.setattr(engine_worker, "setup_runtime_paths", lambda: None)
+    monkeypatch.setattr(engine_worker, "POLL_INTERVAL_SEC", 0.01)
+    engine = StubEngine()
+    monkeypatch.setitem(sys.modules, "SNUs_dsm2irrPkg", types.SimpleNamespace(initialize=lambda: engine))
+    monkeypatch.setitem(sys.modules, "matlab", MATLAB)
+    monkeypatch.setattr(sys, "argv", ["engine_worker.py", "--max-jobs", "1"])
+
+    engine_worker.main()
+    assert calls["claim"] == 3
+    assert store.counts() == {"done": 1}
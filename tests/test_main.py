@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("shapely")
+from fastapi import HTTPException
+
+import db_stub
+db_stub.install()
+
+import engine_worker
+import main
+from engine_stub import MATLAB, TARGET_ID, StubEngine, buildings
+from job_queue import SQLiteJobStore
+from simulation import AggregationRequest
+from workspace import WorkspaceManager
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(main, "job_store", store)
+    monkeypatch.setattr(main, "JOB_POLL_INTERVAL_SEC", 0.01)
+    monkeypatch.setattr(main, "JOB_WAIT_TIMEOUT_SEC", 10)
+    monkeypatch.setattr(engine_worker, "SessionLocal", db_stub.make_database(buildings()).SessionLocal)
+    return store
+
+
+@pytest.fixture
+def worker(store, tmp_path):
+    """store 의 작업을 처리하는 엔진 워커 스레드 (가짜 MATLAB)"""
+    workspace_manager = WorkspaceManager(root=str(tmp_path / "ws"), quota_bytes=0, slots=1)
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            job = store.claim("w")
+            if job is None:
+                time.sleep(0.01)
+                continue
+            engine_worker.process_job(store, job, "w", StubEngine(), MATLAB, workspace_manager)
+
+    thread = threading.Thread(target=loop)
+    thread.start()
+    yield
+    stop.set()
+    thread.join()
+
+
+def test_wait_for_job_returns_result(store, worker):
+    result = asyncio.run(main.wait_for_job(TARGET_ID, AggregationRequest(rollups=["annual"])))
+    assert result["aggregates"] == {"annual_kwh": 8760.0}
+    assert result["buildings_in_radius"] == 2
+    assert store.counts() == {"done": 1}
+
+
+def test_wait_for_job_passes_error_code_through(store, worker):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(main.wait_for_job(999, None))
+    assert e.value.status_code == 404
+    assert "Building ID not found" in e.value.detail
+
+
+def test_wait_for_job_times_out(store, monkeypatch):
+    monkeypatch.setattr(main, "JOB_WAIT_TIMEOUT_SEC", 0.05)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(main.wait_for_job(TARGET_ID, None))
+    assert e.value.status_code == 504
+    # 작업은 남아 있어 GET /jobs/{job_id} 로 계속 확인 가능
+    assert store.counts() == {"queued": 1}
+
+
+def test_store_calls_run_off_the_event_loop(store, worker, monkeypatch):
+    threads = []
+    real_get = store.get
+
+    def get(job_id):
+        threads.append(threading.current_thread())
+        return real_get(job_id)
+
+    monkeypatch.setattr(store, "get", get)
+    asyncio.run(main.wait_for_job(TARGET_ID, None))
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import matlab_arrays
+from matlab_stub import make_matlab
+
+MODES = ["buffer", "vector", "list"]
+
+
+@pytest.fixture(params=MODES)
+def ml(request):
+    return make_matlab(request.param)
+
+
+def test_probe_picks_fastest_supported_mode():
+    for mode in MODES:
+        ml = make_matlab(mode)
+        assert matlab_arrays.conversion_mode(ml, "double") == mode
+        assert matlab_arrays.conversion_mode(ml, "logical") == mode
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_double_round_trip(ml, order):
+    arr = np.asarray(np.random.default_rng(0).random((7, 5)), order=order)
+    m = matlab_arrays.to_matlab_double(arr, ml)
+    assert tuple(m.size) == (7, 5)
+    out = matlab_arrays.from_matlab(m)
+    assert out.dtype == np.float64
+    np.testing.assert_array_equal(out, arr)
+
+
+def test_non_contiguous_input(ml):
+    base = np.arange(60, dtype=np.float64).reshape(6, 10)
+    arr = base[::2, 1::3]
+    assert not arr.flags.c_contiguous and not arr.flags.f_contiguous
+    out = matlab_arrays.from_matlab(matlab_arrays.to_matlab_double(arr, ml))
+    np.testing.assert_array_equal(out, arr)
+
+
+def test_scalar_and_vector_become_row_vectors(ml):
+    m = matlab_arrays.to_matlab_double(3.5, ml)
+    assert tuple(m.size) == (1, 1)
+    np.testing.assert_array_equal(matlab_arrays.from_matlab(m), [[3.5]])
+
+    m = matlab_arrays.to_matlab_double([1, 2, 3], ml)
+    assert tuple(m.size) == (1, 3)
+    np.testing.assert_array_equal(matlab_arrays.from_matlab(m), [[1, 2, 3]])
+
+
+def test_logical_round_trip(ml):
+    mask = np.zeros((4, 6), dtype=np.uint8)
+    mask[1:3, 2:5] = 1
+    m = matlab_arrays.to_matlab_logical(mask, ml)
+    out = matlab_arrays.from_matlab(m, dtype=np.bool_)
+    assert out.dtype == np.bool_
+    np.testing.assert_array_equal(out, mask.astype(bool))
+
+
+def test_falls_back_to_list_when_fast_path_rejects_input():
+    ml = make_matlab("buffer")
+    buffer_double = ml.double
+    list_double = make_matlab("list").double
+
+    class Picky(object):
+        # 2x3 시험 배열은 버퍼로 받지만, 그 외 형상은 리스트만 받음
+        def __new__(cls, initializer=None, size=None):
+            if isinstance(initializer, list):
+                return list_double(initializer)
+            if np.asarray(initializer).shape != (2, 3):
+                raise ValueError("unsupported buffer")
+            return buffer_double(initializer)
+
+    ml.double = Picky
+    arr = np.arange(12, dtype=np.float64).reshape(3, 4)
+    assert matlab_arrays.conversion_mode(ml) == "buffer"
+    np.testing.assert_array_equal(matlab_arrays.from_matlab(matlab_arrays.to_matlab_double(arr, ml)), arr)
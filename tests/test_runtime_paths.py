@@ -0,0 +1,90 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import pytest
+
+import runtime_paths
+from runtime_stub import ARCH, make_runtime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_DIR = os.path.join(ROOT, "SNUs_dsm2irrPkgpythonPackage")
+
+linux_only = pytest.mark.skipif(platform.system() != "Linux", reason="stub runtime is glnxa64")
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.setattr(runtime_paths, "CACHE_FILE", str(tmp_path / "cache.json"))
+    monkeypatch.delenv("MATLAB_RUNTIME_ROOT", raising=False)
+    monkeypatch.setenv("LD_LIBRARY_PATH", "")
+    return tmp_path
+
+
+@linux_only
+def test_env_root_wins_and_is_moved_to_front(env, monkeypatch):
+    a = make_runtime(str(env / "A"))
+    b = make_runtime(str(env / "B"))
+    monkeypatch.setenv("LD_LIBRARY_PATH", os.pathsep.join(
+        [os.path.join(b, "runtime", ARCH), "/usr/lib", os.path.join(a, "runtime", ARCH)]))
+    monkeypatch.setenv("MATLAB_RUNTIME_ROOT", a)
+
+    assert runtime_paths.setup_runtime_paths() == a
+    parts = os.environ["LD_LIBRARY_PATH"].split(os.pathsep)
+    assert parts[0] == os.path.join(a, "runtime", ARCH)
+    assert parts.count(os.path.join(a, "runtime", ARCH)) == 1
+    assert parts.index(os.path.join(a, "runtime", ARCH)) < parts.index(os.path.join(b, "runtime", ARCH))
+
+
+@linux_only
+def test_cache_is_invalidated_when_path_variable_changes(env, monkeypatch):
+    a = make_runtime(str(env / "A"))
+    b = make_runtime(str(env / "B"))
+    monkeypatch.setenv("LD_LIBRARY_PATH", os.path.join(a, "runtime", ARCH))
+    assert runtime_paths.find_runtime_root() == a
+    with open(runtime_paths.CACHE_FILE) as f:
+        assert json.load(f)["root"] == a
+
+    # 같은 환경이면 캐시 사용, 운영자가 다른 Runtime 을 가리키면 다시 찾음
+    assert runtime_paths.find_runtime_root() == a
+    monkeypatch.setenv("LD_LIBRARY_PATH", os.path.join(b, "runtime", ARCH))
+    assert runtime_paths.find_runtime_root() == b
+
+
+def test_invalid_env_root_raises(env, monkeypatch):
+    monkeypatch.setenv("MATLAB_RUNTIME_ROOT", str(env / "missing"))
+    with pytest.raises(RuntimeError):
+        runtime_paths.find_runtime_root()
+
+
+@linux_only
+def test_package_loads_the_runtime_runtime_paths_chose(env):
+    a = make_runtime(str(env / "A"))
+    b = make_runtime(str(env / "B"))
+    child_env = dict(os.environ,
+                     MATLAB_RUNTIME_ROOT=a,
+                     MATLAB_RUNTIME_CACHE=str(env / "cache.json"),
+                     LD_LIBRARY_PATH=os.path.join(b, "runtime", ARCH),
+                     PYTHONPATH=os.pathsep.join([ROOT, PKG_DIR]))
+    code = ("import runtime_paths; runtime_paths.setup_runtime_paths(); "
+            "import SNUs_dsm2irrPkg; print(SNUs_dsm2irrPkg._pir.bin_dir)")
+    out = subprocess.run([sys.executable, "-c", code], env=child_env, cwd=str(env),
+                         capture_output=True, text=True, check=True).stdout.strip()
+    assert out == os.path.join(a, "bin", ARCH)
+
+
+def test_api_only_mode_does_not_touch_runtime(tmp_path):
+    # API 전용 모드는 MATLAB 을 띄우지 않으므로 Runtime 설정이 잘못돼 있어도 떠야 함
+    code = ("import db_stub; db_stub.install()\n"
+            "import main; main.startup_event()\n")
+    env = dict(os.environ,
+               SIM_JOB_STORE=str(tmp_path / "jobs.sqlite3"),
+               MATLAB_RUNTIME_ROOT=str(tmp_path / "missing"),
+               PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "tests")]))
+    out = subprocess.run([sys.executable, "-c", code], env=env, cwd=str(tmp_path),
+                         capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert "Runtime not found" not in out.stdout
+    assert "API-only mode" in out.stdout
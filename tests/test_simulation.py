@@ -0,0 +1,29 @@
+import numpy as np
+
+import aggregation
+from simulation import AggregationRequest, build_response, cached_summary, collect_results
+from test_aggregation import WEATHER_CSV
+
+
+def test_cached_response_has_same_keys_as_fresh_run(tmp_path):
+    cache = aggregation.LocalResultCache(str(tmp_path / "cache"))
+    result_csv = tmp_path / "result.csv"
+    result_csv.write_text("kwh\n" + "\n".join(["1.0"] * 8760) + "\n")
+    buildings = [{"geom": "a", "height": 3.3, "is_target": True}, {"geom": "b", "height": 6.6, "is_target": False}]
+    agg = AggregationRequest(rollups=["annual"])
+
+    assert cached_summary(cache, 7, buildings, "fp", agg, WEATHER_CSV) is None
+    _, summary = collect_results(cache, str(result_csv), 7, "fp", agg, WEATHER_CSV)
+    fresh = build_response(7, buildings, [], summary)
+    cached = cached_summary(cache, 7, buildings, "fp", agg, WEATHER_CSV)
+
+    assert cached.keys() == fresh.keys()
+    assert cached["buildings_in_radius"] == fresh["buildings_in_radius"] == 2
+    assert (fresh["cached"], cached["cached"]) == (False, True)
+    assert cached["aggregates"] == fresh["aggregates"] == {"annual_kwh": 8760.0}
+
+    # 집계 캐시가 없어도 원본 결과로 다시 계산해 같은 모양으로 응답
+    other = AggregationRequest(rollups=["monthly"])
+    recomputed = cached_summary(cache, 7, buildings, "fp", other, WEATHER_CSV)
+    assert recomputed.keys() == fresh.keys()
+    assert np.isclose(sum(recomputed["aggregates"]["monthly_kwh"].values()), 8760.0)
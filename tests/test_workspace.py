@@ -0,0 +1,82 @@
+import os
+import time
+from collections import namedtuple
+
+import pytest
+
+import workspace
+from workspace import WorkspaceManager, WorkspaceQuotaError
+
+DEAD_PID = 2 ** 22 + 12345  # pid_max 보다 큼 -> 항상 죽은 프로세스
+
+
+def _old(path):
+    t = time.time() - workspace.LEGACY_MAX_AGE_SEC - 60
+    os.utime(path, (t, t))
+
+
+def test_sweep_only_removes_own_orphans(tmp_path):
+    root = tmp_path / "root"
+    for name in (f"slot-{DEAD_PID}-0", f"req-{DEAD_PID}-3", f"slot-{os.getppid()}-0",
+                 "important_old_dir", f"slot-{DEAD_PID}-0-keep", "slot-abc-0"):
+        (root / name).mkdir(parents=True)
+    _old(root / "important_old_dir")
+
+    m = WorkspaceManager(root=str(root), quota_bytes=0, slots=1)
+    assert m.sweep_orphans(legacy_dir=None) == 2
+    assert sorted(os.listdir(root)) == sorted([
+        f"slot-{os.getppid()}-0", "important_old_dir", f"slot-{DEAD_PID}-0-keep", "slot-abc-0"])
+
+
+def test_sweep_legacy_uuid_dirs(tmp_path):
+    legacy = tmp_path / "temp"
+    old_uuid = legacy / "0b0e8f3a-1c2d-4e5f-8a9b-0c1d2e3f4a5b"
+    new_uuid = legacy / "1b0e8f3a-1c2d-4e5f-8a9b-0c1d2e3f4a5b"
+    other = legacy / "notes"
+    for d in (old_uuid, new_uuid, other):
+        d.mkdir(parents=True)
+    _old(old_uuid)
+    _old(other)
+
+    m = WorkspaceManager(root=str(tmp_path / "root"), quota_bytes=0, slots=1)
+    assert m.sweep_orphans(legacy_dir=str(legacy)) == 1
+    assert sorted(os.listdir(legacy)) == sorted([new_uuid.name, "notes"])
+
+
+def test_slots_are_reused_and_cleared(tmp_path):
+    m = WorkspaceManager(root=str(tmp_path), quota_bytes=0, slots=1)
+    m.preallocate()
+    with m.acquire() as ws:
+        first = ws.path
+        (tmp_path / os.path.basename(first) / "a.npy").write_bytes(b"x" * 100)
+        with m.acquire() as extra:
+            assert not extra.is_slot
+        assert not os.path.exists(extra.path)
+    with m.acquire() as ws:
+        assert ws.path == first and os.listdir(first) == []
+    stats = m.metrics()
+    assert stats["requests"] == 3 and stats["bytes_max"] == 100 and stats["overflow_dirs"] == 1
+
+
+def test_quota_is_checked_and_counted(tmp_path):
+    m = WorkspaceManager(root=str(tmp_path), quota_bytes=10, slots=1)
+    m.preallocate()
+    with pytest.raises(WorkspaceQuotaError):
+        with m.acquire() as ws:
+            with open(os.path.join(ws.path, "big"), "wb") as f:
+                f.write(b"x" * 11)
+            ws.check_quota()
+    assert m.metrics()["quota_exceeded"] == 1
+
+
+def test_free_space_check(tmp_path, monkeypatch):
+    m = WorkspaceManager(root=str(tmp_path), quota_bytes=1000, slots=1)
+    m.preallocate()
+    usage = namedtuple("usage", "total used free")
+    monkeypatch.setattr(workspace.shutil, "disk_usage", lambda p: usage(2000, 1500, 500))
+    with m.acquire() as ws:
+        with pytest.raises(WorkspaceQuotaError):
+            ws.ensure_free_space()
+    monkeypatch.setattr(workspace.shutil, "disk_usage", lambda p: usage(2000, 0, 2000))
+    with m.acquire() as ws:
+        ws.ensure_free_space()
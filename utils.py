@@ -1,15 +1,34 @@
 import numpy as np
-import cv2
-from shapely import wkb
-from shapely.ops import transform
-import pyproj
 import os
 
+# cv2 / shapely 는 임포트 비용이 커서 render_simulation_inputs 안에서 불러옴
+# (아래 주석 처리된 좌표 변환 버전을 다시 쓰려면 pyproj, shapely.ops.transform 필요)
+
 # DB(WGS84, EPSG:4326) -> 미터좌표(UTM-K, EPSG:5179) 변환기
 # 한국 기준 가장 정확한 거리 계산을 위해 5179 사용
 # transformer = pyproj.Transformer.from_crs("epsg:4326", "epsg:5179", always_xy=True).transform
 
 def create_simulation_inputs(target_geom_wkb, neighbor_list, output_dir, file_prefix):
+    dsm, mask_roof = render_simulation_inputs(target_geom_wkb, neighbor_list)
+
+    # 저장
+    os.makedirs(output_dir, exist_ok=True)
+    path_dsm = os.path.join(output_dir, f"{file_prefix}_floco.npy")
+    path_roof = os.path.join(output_dir, f"{file_prefix}_rm_roof.npy")
+    path_facade = os.path.join(output_dir, f"{file_prefix}_rm_facade.npy")
+
+    np.save(path_dsm, dsm)
+    np.save(path_roof, mask_roof)
+    np.save(path_facade, mask_roof)
+
+    return path_dsm, path_roof, path_facade
+
+
+def render_simulation_inputs(target_geom_wkb, neighbor_list):
+    """DSM(높이, float64)과 지붕 마스크(uint8) 배열을 만든다 (파일 저장 없음)"""
+    import cv2
+    from shapely import wkb
+
     CANVAS_SIZE = 1000   # 1000x1000 픽셀
     PIXEL_PER_METER = 1.0
 
@@ -62,17 +81,7 @@ def create_simulation_inputs(target_geom_wkb, neighbor_list, output_dir, file_pr
         if building["is_target"]:
             cv2.fillPoly(mask_roof, pixel_polys, color=1)
 
-    # 5) 저장
-    os.makedirs(output_dir, exist_ok=True)
-    path_dsm = os.path.join(output_dir, f"{file_prefix}_floco.npy")
-    path_roof = os.path.join(output_dir, f"{file_prefix}_rm_roof.npy")
-    path_facade = os.path.join(output_dir, f"{file_prefix}_rm_facade.npy")
-
-    np.save(path_dsm, dsm)
-    np.save(path_roof, mask_roof)
-    np.save(path_facade, mask_roof)
-
-    return path_dsm, path_roof, path_facade
+    return dsm, mask_roof
 
 
 # def create_simulation_inputs(target_geom_wkb, neighbor_list, output_dir, file_prefix):
@@ -0,0 +1,214 @@
+import os
+import re
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+
+# 요청별 임시 작업 폴더 관리
+# - 루트: 환경변수 SIM_WORKSPACE_ROOT > tmpfs(/dev/shm) > ./temp
+# - 요청별 용량 제한 (SIM_WORKSPACE_QUOTA_MB)
+#   * 사용량 확인은 단계(전처리, MATLAB)가 끝난 뒤에 하는 사후 제한임. MATLAB 실행 중 쓰는 양은 막지 못함
+#   * 대신 MATLAB 실행 전에 루트 파일시스템에 quota 만큼 빈 공간이 있는지 확인 (ensure_free_space)
+#   * 엄격한 제한이 필요하면 SIM_WORKSPACE_ROOT 를 크기 제한된 tmpfs 마운트로 지정할 것
+#     (예: mount -t tmpfs -o size=2g tmpfs /mnt/icp_sim)
+# - 시작 시 죽은 프로세스가 남긴 폴더 정리 (이 관리자가 만든 slot-/req- 폴더만)
+# - 워커별로 미리 만든 슬롯 폴더를 재사용 (mkdir/rmtree 반복 방지)
+# - 요청별 기록 용량 통계
+
+TMPFS_DIR = "/dev/shm"
+DEFAULT_QUOTA_MB = 512
+DEFAULT_SLOTS = 2
+# 예전 방식(./temp/<uuid>)으로 남은 폴더는 이 시간이 지나면 정리
+LEGACY_TEMP_DIR = "temp"
+LEGACY_MAX_AGE_SEC = 6 * 3600
+
+_DIR_PATTERN = re.compile(r"^(slot|req)-(\d+)-\d+$")
+_UUID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+class WorkspaceQuotaError(Exception):
+    pass
+
+
+def default_root():
+    root = os.environ.get("SIM_WORKSPACE_ROOT")
+    if root:
+        return os.path.abspath(root)
+    if os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK):
+        return os.path.join(TMPFS_DIR, "icp_sim")
+    return os.path.abspath("temp")
+
+
+def dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 다른 사용자 프로세스 - 살아있는 것으로 간주
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _clear_dir(path):
+    """폴더 자체는 남기고 안의 내용만 삭제 (슬롯 재사용용)"""
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class Workspace:
+    def __init__(self, path, quota_bytes, is_slot):
+        self.path = path
+        self.quota_bytes = quota_bytes
+        self.is_slot = is_slot
+        self.quota_exceeded = False
+
+    def used_bytes(self):
+        return dir_size(self.path)
+
+    def check_quota(self):
+        """용량 초과 시 WorkspaceQuotaError. 단계가 끝날 때마다 호출 (사후 확인)"""
+        used = self.used_bytes()
+        if self.quota_bytes and used > self.quota_bytes:
+            self.quota_exceeded = True
+            raise WorkspaceQuotaError(
+                f"Workspace quota exceeded: {used} bytes > {self.quota_bytes} bytes")
+        return used
+
+    def ensure_free_space(self):
+        """파일시스템 여유 공간이 quota 보다 작으면 WorkspaceQuotaError. MATLAB 실행 전 호출
+
+        기본 루트(tmpfs)는 메모리를 쓰므로, 여유가 없을 때 MATLAB 을 돌려 RAM 을 고갈시키지 않기 위함.
+        """
+        if not self.quota_bytes:
+            return
+        free = shutil.disk_usage(self.path).free
+        if free < self.quota_bytes:
+            raise WorkspaceQuotaError(
+                f"Not enough free space in workspace: {free} bytes < {self.quota_bytes} bytes")
+
+
+class WorkspaceManager:
+    def __init__(self, root=None, quota_bytes=None, slots=None):
+        self.root = root or default_root()
+        if quota_bytes is None:
+            quota_bytes = int(float(os.environ.get("SIM_WORKSPACE_QUOTA_MB", DEFAULT_QUOTA_MB)) * 1024 * 1024)
+        self.quota_bytes = quota_bytes
+        self.slots = slots if slots is not None else int(os.environ.get("SIM_WORKSPACE_SLOTS", DEFAULT_SLOTS))
+
+        self._lock = threading.Lock()
+        self._free_slots = []
+        self._seq = 0
+        self.stats = {
+            "requests": 0,
+            "bytes_total": 0,
+            "bytes_last": 0,
+            "bytes_max": 0,
+            "quota_exceeded": 0,
+            "overflow_dirs": 0,
+        }
+
+    def sweep_orphans(self, legacy_dir=LEGACY_TEMP_DIR):
+        """시작 시 호출: 이미 종료된 프로세스(또는 재시작 전의 이 PID)가 남긴 폴더 삭제
+
+        루트 아래에서는 이 관리자의 이름 규칙(slot-<pid>-<n>, req-<pid>-<n>)에 맞는 폴더만 지운다.
+        (SIM_WORKSPACE_ROOT 가 /tmp 같은 공유 폴더여도 다른 데이터는 건드리지 않음)
+        예전 방식의 ./temp/<uuid> 폴더는 UUID 이름이고 오래된 것만 따로 정리.
+        """
+        removed = 0
+        my_pid = os.getpid()
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                m = _DIR_PATTERN.match(entry.name)
+                if not m or not entry.is_dir(follow_symlinks=False):
+                    continue
+                pid = int(m.group(2))
+                # 슬롯 할당 전이므로 같은 PID 폴더도 이전 프로세스의 잔재임
+                if pid == my_pid or not _pid_alive(pid):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+
+        legacy_dir = os.path.abspath(legacy_dir) if legacy_dir else None
+        if legacy_dir and os.path.isdir(legacy_dir):
+            now = time.time()
+            for entry in os.scandir(legacy_dir):
+                if not _UUID_PATTERN.match(entry.name) or not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    stale = now - entry.stat().st_mtime > LEGACY_MAX_AGE_SEC
+                except OSError:
+                    stale = False
+                if stale:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+        return removed
+
+    def preallocate(self):
+        """워커 프로세스별 슬롯 폴더 미리 생성"""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            for i in range(len(self._free_slots), self.slots):
+                path = os.path.join(self.root, f"slot-{os.getpid()}-{i}")
+                os.makedirs(path, exist_ok=True)
+                _clear_dir(path)
+                self._free_slots.append(path)
+
+    @contextmanager
+    def acquire(self):
+        """빈 슬롯을 빌려주고, 끝나면 내용을 비워 반납. 슬롯이 없으면 일회용 폴더 생성"""
+        with self._lock:
+            if self._free_slots:
+                path, is_slot = self._free_slots.pop(), True
+            else:
+                self._seq += 1
+                path, is_slot = os.path.join(self.root, f"req-{os.getpid()}-{self._seq}"), False
+                self.stats["overflow_dirs"] += 1
+        os.makedirs(path, exist_ok=True)
+
+        ws = Workspace(path, self.quota_bytes, is_slot)
+        try:
+            yield ws
+        finally:
+            used = ws.used_bytes()
+            if is_slot:
+                _clear_dir(path)
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+            with self._lock:
+                self.stats["requests"] += 1
+                self.stats["bytes_total"] += used
+                self.stats["bytes_last"] = used
+                self.stats["bytes_max"] = max(self.stats["bytes_max"], used)
+                if ws.quota_exceeded:
+                    self.stats["quota_exceeded"] += 1
+                if is_slot:
+                    self._free_slots.append(path)
+
+    def metrics(self):
+        with self._lock:
+            data = dict(self.stats)
+            data["free_slots"] = len(self._free_slots)
+        data["root"] = self.root
+        data["quota_bytes"] = self.quota_bytes
+        data["bytes_avg"] = data["bytes_total"] / data["requests"] if data["requests"] else 0
+        return data